@@ -0,0 +1,139 @@
+"""
+Storage saved against recall@k of the compact ColBERT storage options.
+
+Embeds the fixture corpus with the late-interaction model of model_config.yaml and applies each
+LATE_INTERACTION_STORAGE combination (POOL_FACTOR, DATATYPE, QUANTIZATION) to the passage
+multivectors. Like Qdrant, a quantized variant keeps the original vectors on disk and the
+quantized ones in RAM, ranks the corpus with the quantized passages against the float query and
+rescores the top k * oversampling with the original vectors. Reports the bytes on disk and in
+RAM, recall@k and the overlap of the top k with exact float32 MaxSim. Savings are measured
+against the storage the collections use today (float32 with INT8 scalar quantization).
+
+    python -m src.benchmarks.colbert_storage_benchmark
+    python -m src.benchmarks.colbert_storage_benchmark --corpus my_corpus.jsonl --queries my_queries.jsonl -k 3 --oversampling 2
+"""
+import os
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.benchmarks.qdrant_fixtures import FIXTURES_DIR, load_jsonl
+from src.helpers.text_preprocess_helper import late_interaction_text_embedding_model, pool_token_vectors
+
+
+def max_sim(query_vectors: np.ndarray, passage_vectors: np.ndarray) -> float:
+    return float((query_vectors @ passage_vectors.T).max(axis=1).sum())
+
+
+def to_datatype(vectors: np.ndarray, datatype: str) -> np.ndarray:
+    return vectors.astype(np.float16).astype(np.float32) if datatype == 'float16' else vectors
+
+
+def scalar_quantize(passages_vectors: List[np.ndarray]) -> List[np.ndarray]:
+    # INT8 scalar quantization: every dimension is mapped on 256 levels between the min and the
+    # max of the collection, the query stays float
+    low = min(float(vectors.min()) for vectors in passages_vectors)
+    high = max(float(vectors.max()) for vectors in passages_vectors)
+    step = (high - low) / 255 or 1.0
+    return [low + np.round((vectors - low) / step) * step for vectors in passages_vectors]
+
+
+def binary_quantize(passages_vectors: List[np.ndarray]) -> List[np.ndarray]:
+    # Binary quantization keeps the sign of each dimension, the query stays float
+    return [np.where(vectors > 0, 1.0, -1.0).astype(np.float32) for vectors in passages_vectors]
+
+
+DATATYPE_BYTES = {'float32': 4, 'float16': 2}
+# quantization -> (quantize, bytes per dimension kept in RAM)
+QUANTIZATIONS: Dict[str, Tuple[Optional[Callable], float]] = {
+    'none': (None, 0),
+    'scalar': (scalar_quantize, 1),
+    'binary': (binary_quantize, 1 / 8),
+}
+
+BASELINE_VARIANT = 'float32+scalar'
+# name -> (POOL_FACTOR, DATATYPE, QUANTIZATION)
+VARIANTS: Dict[str, Tuple[int, str, str]] = {
+    'float32+scalar': (1, 'float32', 'scalar'),
+    'float32': (1, 'float32', 'none'),
+    'float16+scalar': (1, 'float16', 'scalar'),
+    'pool2+scalar': (2, 'float32', 'scalar'),
+    'pool3+scalar': (3, 'float32', 'scalar'),
+    'pool2+float16+scalar': (2, 'float16', 'scalar'),
+    'binary': (1, 'float32', 'binary'),
+    'float16+binary': (1, 'float16', 'binary'),
+}
+
+
+def rank(query_vectors: np.ndarray, passages_vectors: List[np.ndarray]) -> np.ndarray:
+    scores = np.array([max_sim(query_vectors, passage_vectors) for passage_vectors in passages_vectors])
+    return np.argsort(-scores, kind='stable')
+
+
+def search(
+    query_vectors: np.ndarray,
+    stored_vectors: List[np.ndarray],
+    quantized_vectors: Optional[List[np.ndarray]],
+    limit: int
+) -> np.ndarray:
+    if quantized_vectors is None:
+        return rank(query_vectors, stored_vectors)[:limit]
+    candidates = rank(query_vectors, quantized_vectors)[:limit]
+    rescored = rank(query_vectors, [stored_vectors[i] for i in candidates])
+    return candidates[rescored]
+
+
+def run(corpus_path: str, queries_path: str, k: int, oversampling: float = 1.0) -> List[Dict]:
+    corpus = load_jsonl(corpus_path)
+    queries = load_jsonl(queries_path)
+    corpus_ids = [passage['id'] for passage in corpus]
+
+    passages_vectors = list(late_interaction_text_embedding_model.passage_embed([passage['text'] for passage in corpus]))
+    queries_vectors = list(late_interaction_text_embedding_model.query_embed([query['query'] for query in queries]))
+    baseline_top_k = [rank(query_vectors, passages_vectors)[:k] for query_vectors in queries_vectors]
+    limit = max(k, int(round(k * oversampling)))
+
+    results = []
+    for name, (pool_factor, datatype, quantization) in VARIANTS.items():
+        stored_vectors = [to_datatype(pool_token_vectors(vectors, pool_factor), datatype) for vectors in passages_vectors]
+        quantize, ram_bytes_per_dimension = QUANTIZATIONS[quantization]
+        quantized_vectors = quantize(stored_vectors) if quantize else None
+        dimensions = sum(vectors.shape[0] * vectors.shape[1] for vectors in stored_vectors)
+
+        hits, overlap = 0, 0
+        for query, query_vectors, baseline in zip(queries, queries_vectors, baseline_top_k):
+            top_k = search(query_vectors, stored_vectors, quantized_vectors, limit)[:k]
+            hits += bool(set(query['relevant_ids']) & {corpus_ids[i] for i in top_k})
+            overlap += len(set(top_k) & set(baseline))
+
+        results.append({
+            'variant': name,
+            'disk_bytes': int(dimensions * DATATYPE_BYTES[datatype]),
+            'ram_bytes': int(dimensions * ram_bytes_per_dimension),
+            'tokens': sum(vectors.shape[0] for vectors in stored_vectors),
+            f'recall@{k}': round(hits / len(queries), 4),
+            f'overlap@{k}': round(overlap / (k * len(queries)), 4),
+        })
+
+    baseline = next(result for result in results if result['variant'] == BASELINE_VARIANT)
+    for result in results:
+        result['disk_saved'] = f"{1 - result['disk_bytes'] / baseline['disk_bytes']:.1%}"
+        result['ram_saved'] = f"{1 - result['ram_bytes'] / baseline['ram_bytes']:.1%}"
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the compact ColBERT storage options.')
+    parser.add_argument('--corpus', default=os.path.join(FIXTURES_DIR, 'corpus.jsonl'))
+    parser.add_argument('--queries', default=os.path.join(FIXTURES_DIR, 'queries.jsonl'))
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--oversampling', type=float, default=1.0,
+                        help='Candidates rescored with the original vectors, as a multiple of k.')
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.queries, args.k, args.oversampling)
+    columns = list(results[0])
+    print(' | '.join(f'{column:>14}' for column in columns))
+    for result in results:
+        print(' | '.join(f'{str(result[column]):>14}' for column in columns))
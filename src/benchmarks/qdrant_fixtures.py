@@ -0,0 +1,105 @@
+"""
+Embedded Qdrant connections and corpora for offline benchmarks.
+
+embedded_connection() builds a QdrantConnection on a Qdrant running inside the process
+(in memory or on disk) with its own caches, so nothing is shared with the API singletons.
+The corpora come as the langchain Documents DataIngestion produces, with the same metadata
+(document_name, headers, index, document_id, extension, created_at).
+"""
+import os
+import json
+import random
+import uuid
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from src.helpers.collection_cache_helper import CollectionMetadataCache
+from src.helpers.qdrant_connection_helper import QdrantConnection, create_async_qdrant_client
+from src.helpers.query_embedding_helper import QueryEmbeddingCache, QueryEncoder
+from src.helpers.semantic_cache_helper import SemanticRetrievalCache
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Namespace of the document IDs of the benchmark corpora
+BENCHMARK_DOCUMENT_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "chatbot-rag/benchmarks")
+
+SYNTHETIC_TOPICS = {
+    'leave': ['annual', 'leave', 'vacation', 'carry', 'over', 'sick', 'certificate', 'holiday', 'approval', 'days'],
+    'expenses': ['expense', 'receipt', 'reimbursement', 'travel', 'hotel', 'meal', 'allowance', 'claim', 'invoice', 'limit'],
+    'security': ['password', 'laptop', 'encryption', 'badge', 'access', 'incident', 'phishing', 'vpn', 'backup', 'device'],
+    'onboarding': ['contract', 'probation', 'mentor', 'training', 'equipment', 'account', 'orientation', 'payroll', 'benefits', 'team'],
+    'support': ['ticket', 'priority', 'response', 'escalation', 'customer', 'outage', 'sla', 'resolution', 'channel', 'shift'],
+}
+FILLER_WORDS = ['the', 'employee', 'must', 'within', 'each', 'policy', 'request', 'manager', 'company', 'after', 'before', 'per']
+
+
+def load_jsonl(path: str) -> List[dict]:
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def _document(text: str, document_name: str, headers: str, index: int, created_at: str) -> Document:
+    return Document(page_content=text, metadata={
+        'document_name': document_name,
+        'index': index,
+        'headers': headers,
+        'document_id': str(uuid.uuid5(BENCHMARK_DOCUMENT_NAMESPACE, document_name)),
+        'extension': os.path.splitext(document_name)[1][1:],
+        'created_at': created_at,
+    })
+
+
+def fixture_documents(path: str = os.path.join(FIXTURES_DIR, 'corpus.jsonl')) -> List[Document]:
+    # One section per passage id prefix (leave-1, leave-2 -> "leave"), in file order
+    created_at = datetime.now(timezone.utc).isoformat()
+    documents = []
+    for document_name, passages in groupby(load_jsonl(path), key=lambda passage: passage['document_name']):
+        for index, passage in enumerate(passages):
+            headers = f"Header 1: {passage['id'].rsplit('-', 1)[0]}"
+            documents.append(_document(passage['text'], document_name, headers, index, created_at))
+    return documents
+
+
+def synthetic_documents(
+    n_documents: int = 20,
+    sections_per_document: int = 5,
+    chunks_per_section: int = 8,
+    words_per_chunk: int = 45,
+    seed: int = 0
+) -> List[Document]:
+    # Chunks of about 300 characters, the size of the markdown splitter of DocumentExtraction
+    rng = random.Random(seed)
+    topics = list(SYNTHETIC_TOPICS)
+    created_at = datetime.now(timezone.utc).isoformat()
+    documents = []
+    for document_number in range(n_documents):
+        document_name = f"synthetic_{document_number:04d}.{rng.choice(['pdf', 'docx', 'md'])}"
+        index = 0
+        for section_number in range(sections_per_document):
+            topic = rng.choice(topics)
+            headers = f"Header 1: {topic}, Header 2: section {section_number}"
+            for _ in range(chunks_per_section):
+                words = [
+                    rng.choice(SYNTHETIC_TOPICS[topic]) if rng.random() < 0.4 else rng.choice(FILLER_WORDS)
+                    for _ in range(words_per_chunk)
+                ]
+                documents.append(_document(' '.join(words).capitalize() + '.', document_name, headers, index, created_at))
+                index += 1
+    return documents
+
+
+def embedded_connection(
+    mode: str = 'memory',
+    path: Optional[str] = None,
+    cache_queries: bool = False
+) -> QdrantConnection:
+    # Without the query cache every search pays for its query encoding, as a first request does
+    return QdrantConnection(
+        client=create_async_qdrant_client(mode=mode, path=path),
+        encoder=QueryEncoder(cache=QueryEmbeddingCache(max_size=2048 if cache_queries else 0)),
+        metadata_cache=CollectionMetadataCache(),
+        retrieval_cache=SemanticRetrievalCache(),
+    )
@@ -0,0 +1,80 @@
+"""
+Throughput of the torch and int8 ONNX reranker backends on CPU.
+
+Scores every (fixture query, fixture passage) pair with each backend and reports pairs per
+second for whole-corpus batches and the latency of one rerank call of --rerank-pairs pairs,
+the size SearchRetrieval scores per request.
+
+    python -m src.benchmarks.reranker_backend_benchmark
+    python -m src.benchmarks.reranker_backend_benchmark --model CROSS_ENCODER_MS_MARCO_RERANK --repeat 5
+"""
+import os
+import time
+import argparse
+import statistics
+from typing import Any, Dict, List, Tuple
+
+from FlagEmbedding import FlagReranker
+
+from src.benchmarks.qdrant_fixtures import FIXTURES_DIR, load_jsonl
+from src.helpers.model_loader_helper import ModelLoader
+from src.helpers.onnx_reranker_helper import OnnxReranker
+
+
+def load_pairs(corpus_path: str, queries_path: str) -> Tuple[List[str], List[str]]:
+    passages = [passage['text'] for passage in load_jsonl(corpus_path)]
+    queries = [query['query'] for query in load_jsonl(queries_path)]
+    return queries, passages
+
+
+def load_backends(model_name: str) -> Dict[str, Any]:
+    # fp32 torch is the reference: fp16 gives no speedup on CPU
+    return {
+        'torch': FlagReranker(model_name, use_fp16=False),
+        'onnx_int8': OnnxReranker(model_name),
+    }
+
+
+def run(args: argparse.Namespace) -> List[Dict]:
+    queries, passages = load_pairs(args.corpus, args.queries)
+    pairs = [[query, passage] for query in queries for passage in passages]
+    rerank_pairs = pairs[:args.rerank_pairs]
+
+    results = []
+    for name, reranker in load_backends(ModelLoader._resolve_model_name(args.model, "BAAI_COLLECTION_RERANK")).items():
+        reranker.compute_score(rerank_pairs, normalize=True)  # warm up
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            reranker.compute_score(pairs, normalize=True)
+        corpus_seconds = (time.perf_counter() - start) / args.repeat
+
+        call_seconds = []
+        for _ in range(args.repeat * 5):
+            start = time.perf_counter()
+            reranker.compute_score(rerank_pairs, normalize=True)
+            call_seconds.append(time.perf_counter() - start)
+
+        results.append({
+            'backend': name,
+            'pairs': len(pairs),
+            'pairs_per_s': round(len(pairs) / corpus_seconds, 1),
+            f'p50_ms@{len(rerank_pairs)}': round(statistics.median(call_seconds) * 1000, 2),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the torch and int8 ONNX reranker backends.')
+    parser.add_argument('--model', default='BAAI_COLLECTION_RERANK', help='RERANKING_MODEL key or model name')
+    parser.add_argument('--corpus', default=os.path.join(FIXTURES_DIR, 'corpus.jsonl'))
+    parser.add_argument('--queries', default=os.path.join(FIXTURES_DIR, 'queries.jsonl'))
+    parser.add_argument('--rerank-pairs', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args)
+    columns = list(results[0])
+    print(' | '.join(f'{column:>14}' for column in columns))
+    for result in results:
+        print(' | '.join(f'{str(result[column]):>14}' for column in columns))
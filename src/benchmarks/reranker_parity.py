@@ -0,0 +1,72 @@
+"""
+Parity of the int8 ONNX reranker with the fp32 torch reranker.
+
+Scores every (fixture query, fixture passage) pair with both backends and compares the
+normalized scores and the ranking of the passages of each query. Exits with status 1 when
+the scores drift beyond --tolerance or the top-1 passage changes for too many queries, so
+it can gate a switch of RERANKER_BACKEND.BACKEND to onnx_int8.
+
+    python -m src.benchmarks.reranker_parity
+    python -m src.benchmarks.reranker_parity --model MIXEDBREAD_AI_MXBAI_RERANK --tolerance 0.05
+"""
+import os
+import sys
+import argparse
+from typing import Dict
+
+import numpy as np
+
+from src.benchmarks.qdrant_fixtures import FIXTURES_DIR
+from src.benchmarks.reranker_backend_benchmark import load_backends, load_pairs
+from src.helpers.model_loader_helper import ModelLoader
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    rank_a = np.argsort(np.argsort(a)).astype(np.float64)
+    rank_b = np.argsort(np.argsort(b)).astype(np.float64)
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def run(args: argparse.Namespace) -> Dict:
+    queries, passages = load_pairs(args.corpus, args.queries)
+    backends = load_backends(ModelLoader._resolve_model_name(args.model, "BAAI_COLLECTION_RERANK"))
+    scores = {
+        name: np.asarray(
+            reranker.compute_score([[query, passage] for query in queries for passage in passages], normalize=True),
+            dtype=np.float32
+        ).reshape(len(queries), len(passages))
+        for name, reranker in backends.items()
+    }
+    reference, quantized = scores['torch'], scores['onnx_int8']
+
+    difference = np.abs(reference - quantized)
+    top_k = min(args.k, len(passages))
+    return {
+        'max_abs_diff': round(float(difference.max()), 4),
+        'mean_abs_diff': round(float(difference.mean()), 4),
+        'mean_spearman': round(float(np.mean([spearman(r, q) for r, q in zip(reference, quantized)])), 4),
+        'top1_agreement': round(float(np.mean(reference.argmax(axis=1) == quantized.argmax(axis=1))), 4),
+        f'overlap@{top_k}': round(float(np.mean([
+            len(set(np.argsort(-r)[:top_k]) & set(np.argsort(-q)[:top_k])) / top_k
+            for r, q in zip(reference, quantized)
+        ])), 4),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the int8 ONNX reranker with the torch reranker.')
+    parser.add_argument('--model', default='BAAI_COLLECTION_RERANK', help='RERANKING_MODEL key or model name')
+    parser.add_argument('--corpus', default=os.path.join(FIXTURES_DIR, 'corpus.jsonl'))
+    parser.add_argument('--queries', default=os.path.join(FIXTURES_DIR, 'queries.jsonl'))
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.05, help='Maximum absolute difference of normalized scores')
+    parser.add_argument('--min-top1-agreement', type=float, default=0.9)
+    args = parser.parse_args()
+
+    report = run(args)
+    for metric, value in report.items():
+        print(f'{metric:>16}: {value}')
+
+    passed = report['max_abs_diff'] <= args.tolerance and report['top1_agreement'] >= args.min_top1_agreement
+    print('PASS' if passed else 'FAIL')
+    sys.exit(0 if passed else 1)
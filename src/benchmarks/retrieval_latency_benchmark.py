@@ -0,0 +1,106 @@
+"""
+Latency and throughput of ingestion and retrieval on an embedded Qdrant.
+
+Loads the fixture corpus plus a synthetic corpus into a fresh collection of an in-process
+Qdrant (no server, no network), then reports the upload throughput of _upload_documents and
+the latency percentiles of hybrid_search and query_headers over the fixture queries.
+Embedded Qdrant has no HNSW or payload indexes, so compare runs with each other rather
+than with a server.
+
+    python -m src.benchmarks.retrieval_latency_benchmark
+    python -m src.benchmarks.retrieval_latency_benchmark --mode local --path /tmp/qdrant_bench --documents 100 --repeat 5
+"""
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List
+
+from src.benchmarks.qdrant_fixtures import (
+    FIXTURES_DIR,
+    embedded_connection,
+    fixture_documents,
+    load_jsonl,
+    synthetic_documents,
+)
+
+COLLECTION_NAME = 'benchmark_retrieval'
+
+
+def summarize(name: str, seconds: List[float]) -> Dict:
+    milliseconds = sorted(second * 1000 for second in seconds)
+    return {
+        'stage': name,
+        'runs': len(milliseconds),
+        'mean_ms': round(statistics.fmean(milliseconds), 2),
+        'p50_ms': round(milliseconds[len(milliseconds) // 2], 2),
+        'p95_ms': round(milliseconds[min(len(milliseconds) - 1, int(len(milliseconds) * 0.95))], 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> List[Dict]:
+    connection = embedded_connection(mode=args.mode, path=args.path, cache_queries=args.cache_queries)
+    queries = [query['query'] for query in load_jsonl(args.queries)]
+    documents = fixture_documents() + synthetic_documents(
+        n_documents=args.documents,
+        sections_per_document=args.sections,
+        chunks_per_section=args.chunks,
+    )
+
+    try:
+        if await connection.collection_exists(COLLECTION_NAME):
+            await connection._delete_collection(COLLECTION_NAME)
+        await connection._create_collection(COLLECTION_NAME)
+
+        start = time.perf_counter()
+        await connection._upload_documents(COLLECTION_NAME, documents, batch_size=args.batch_size)
+        upload_seconds = time.perf_counter() - start
+        connection._invalidate_collection(COLLECTION_NAME)
+
+        search_seconds, expansion_seconds = [], []
+        for _ in range(args.repeat):
+            for query in queries:
+                start = time.perf_counter()
+                candidates = await connection.hybrid_search(query, COLLECTION_NAME, top_k=args.top_k)
+                search_seconds.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                await connection.query_headers(candidates[:args.top_k], COLLECTION_NAME, max_sections=args.top_k)
+                expansion_seconds.append(time.perf_counter() - start)
+    finally:
+        await connection.client.close()
+
+    return [
+        {
+            'stage': '_upload_documents',
+            'runs': len(documents),
+            'mean_ms': round(upload_seconds * 1000 / len(documents), 2),
+            'p50_ms': '-',
+            'p95_ms': '-',
+            'chunks_per_s': round(len(documents) / upload_seconds, 1),
+        },
+        {**summarize('hybrid_search', search_seconds), 'chunks_per_s': '-'},
+        {**summarize('query_headers', expansion_seconds), 'chunks_per_s': '-'},
+    ]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark ingestion and retrieval on an embedded Qdrant.')
+    parser.add_argument('--mode', choices=['memory', 'local'], default='memory')
+    parser.add_argument('--path', default=None, help='Storage directory of local mode')
+    parser.add_argument('--queries', default=os.path.join(FIXTURES_DIR, 'queries.jsonl'))
+    parser.add_argument('--documents', type=int, default=20, help='Synthetic documents added to the fixture corpus')
+    parser.add_argument('--sections', type=int, default=5)
+    parser.add_argument('--chunks', type=int, default=8, help='Chunks per section')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cache-queries', action='store_true', help='Reuse query embeddings across repeats')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    columns = list(results[0])
+    print(' | '.join(f'{column:>17}' for column in columns))
+    for result in results:
+        print(' | '.join(f'{str(result[column]):>17}' for column in columns))
@@ -9,9 +9,9 @@ from src.utils.constants import TypeDatabase
 from src.utils.logger.custom_logging import LoggerMixin
 
 class FileProcessingVecDB(LoggerMixin):
-    def __init__(self):
+    def __init__(self, qdrant_connection: Optional[QdrantConnection] = None):
         super().__init__()
-        self.qdrant_client = QdrantConnection()
+        self.qdrant_client = qdrant_connection or QdrantConnection()
 
     async def delete_document_by_file_name(self, file_name: str,
                         type_db: str = TypeDatabase.Qdrant.value,
@@ -243,3 +243,45 @@ class CollectionManagementService(LoggerMixin):
             self.logger.error(f"Error getting organization collections: {str(e)}")
             return []
 
+    def rename_organization_collection(
+        self,
+        collection_name: str,
+        new_collection_name: str,
+        organization_id: str
+    ) -> int:
+        """
+        Point the collection records of an organization to another collection name
+        
+        Args:
+            collection_name: Current name of the collection
+            new_collection_name: Name the records should point to
+            organization_id: ID of the organization that owns the records
+            
+        Returns:
+            int: Number of records re-pointed
+        """
+        try:
+            with db.session_scope() as session:
+                records = session.query(Collection).filter_by(
+                    collection_name=collection_name,
+                    organization_id=organization_id
+                ).all()
+                
+                for record in records:
+                    # A user may already own a record of the new collection in this organization
+                    duplicate = session.query(Collection).filter_by(
+                        user_id=record.user_id,
+                        collection_name=new_collection_name,
+                        organization_id=organization_id
+                    ).first()
+                    if duplicate:
+                        session.delete(record)
+                    else:
+                        record.collection_name = new_collection_name
+                
+                self.logger.info(f"Re-pointed {len(records)} collection records from {collection_name} to {new_collection_name}")
+                return len(records)
+                
+        except Exception as e:
+            self.logger.error(f"Error renaming collection records: {str(e)}")
+            raise
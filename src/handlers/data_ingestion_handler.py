@@ -2,11 +2,13 @@ import os
 import hashlib
 import tempfile
 import uuid
-from typing import Tuple
+from datetime import datetime, timezone
+from typing import List, Tuple, Optional
 from fastapi import UploadFile
 
 from src.utils.config import settings
 from src.helpers.qdrant_connection_helper import QdrantConnection
+from langchain_core.documents import Document
 from src.database.data_layer_access.file_management_dal import FileManagementDAL
 
 from src.handlers.file_partition_handler import DocumentExtraction
@@ -15,12 +17,14 @@ from src.utils.logger.custom_logging import LoggerMixin
 # Temporarily disable FileManagementService
 file_management = FileManagementDAL()
 
+# Namespace of the document IDs, stable per (collection, organization, file name)
+DOCUMENT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "chatbot-rag/documents")
+
 class DataIngestion(LoggerMixin):
-    def __init__(self) -> None:
+    def __init__(self, qdrant_connection: Optional[QdrantConnection] = None) -> None:
         super().__init__()
         
-        # Comment out vector database connection
-        self.qdrant_client = QdrantConnection()
+        self.qdrant_client = qdrant_connection or QdrantConnection()
         self.data_extraction = DocumentExtraction() 
     
     @staticmethod
@@ -32,7 +36,27 @@ class DataIngestion(LoggerMixin):
             temp_file.write(file_data)
         return temp_file_path
 
-    async def ingest(self, file: UploadFile, collection_name: str, backend: str) -> dict:
+    @staticmethod
+    def _document_id(collection_name: str, organization_id: Optional[str], file_name: str) -> str:
+        return str(uuid.uuid5(DOCUMENT_ID_NAMESPACE, f"{collection_name}/{organization_id or ''}/{file_name}"))
+
+    @staticmethod
+    def _add_file_metadata(documents: List[Document], file_name: str) -> None:
+        # Filterable fields of the search (see MetadataFilter), indexed in every collection
+        extension = os.path.splitext(file_name)[1][1:].lower()
+        created_at = datetime.now(timezone.utc).isoformat()
+        for doc in documents:
+            doc.metadata['extension'] = extension
+            doc.metadata['created_at'] = created_at
+
+    async def ingest(
+        self,
+        file: UploadFile,
+        collection_name: str,
+        backend: str,
+        organization_id: Optional[str] = None,
+        upsert: bool = True
+    ) -> dict:
         self.logger.info('event=extract-metadata-from-file message="Ingesting document ..."')
         try:
             # Read file data
@@ -43,8 +67,9 @@ class DataIngestion(LoggerMixin):
             # Calculate hash
             sha256 = hashlib.sha256(file_data).hexdigest()
             
-            # Generate a UUID instead of using file management service
-            document_id = str(uuid.uuid4())
+            # Derive the document ID from its location instead of using file management service,
+            # so re-uploading a file updates the chunks it already has
+            document_id = self._document_id(collection_name, organization_id, file.filename)
             
             # Print file metadata for debugging
             print(f"File Metadata:")
@@ -62,11 +87,14 @@ class DataIngestion(LoggerMixin):
                 temp_file_path=temp_file_path, 
                 document_id=document_id
             )
+            self._add_file_metadata(resp.data or [], file.filename)
             
             # Comment out adding to vector database
             await self.qdrant_client.add_data(
                documents=resp.data, 
-               collection_name=collection_name
+               collection_name=collection_name,
+               organization_id=organization_id,
+               upsert=upsert
             )
             
             print(f"\nChunking Results:")
@@ -87,4 +115,51 @@ class DataIngestion(LoggerMixin):
         
         finally:
             # Reset file cursor for potential reuse
-            await file.seek(0)
\ No newline at end of file
+            await file.seek(0)
+
+    async def ingest_bulk(
+        self,
+        files: List[UploadFile],
+        collection_name: str,
+        backend: str,
+        organization_id: Optional[str] = None
+    ) -> dict:
+        """
+        Extract every file first, then load all chunks in one bulk load with indexing deferred.
+
+        Args:
+            files (List[UploadFile]): Files to ingest
+            collection_name (str): Collection to load the chunks into
+            backend (str): Text extraction backend (pymupdf or docling)
+            organization_id (Optional[str]): Organization owning the documents
+
+        Returns:
+            dict: Status and the load statistics (points, seconds, points per second)
+        """
+        self.logger.info(f'event=bulk-ingest message="Bulk ingesting {len(files)} documents ..."')
+        try:
+            documents = []
+            for file in files:
+                file_data = await file.read()
+                temp_file_path = self._save_temp_file(file_name=file.filename, file_data=file_data)
+                resp = await self.data_extraction.extract_text(
+                    file=file,
+                    backend=backend,
+                    temp_file_path=temp_file_path,
+                    document_id=self._document_id(collection_name, organization_id, file.filename)
+                )
+                await file.seek(0)
+                if resp.data:
+                    self._add_file_metadata(resp.data, file.filename)
+                    documents.extend(resp.data)
+
+            stats = await self.qdrant_client.bulk_add_data(
+                documents=documents,
+                collection_name=collection_name,
+                organization_id=organization_id
+            )
+            return {"status": "success", "message": "Processed successfully", "data": stats}
+
+        except Exception as e:
+            self.logger.error(f'error={e}')
+            return {"status": "error", "message": f"Processing failed because of {e}"}
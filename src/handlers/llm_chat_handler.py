@@ -3,6 +3,7 @@ from src.handlers.retrieval_handler import SearchRetrieval
 from src.helpers.llm_helper import LLMGenerator
 from src.helpers.prompt_template_helper import ContextualizeQuestionHistoryTemplate, QuestionAnswerTemplate
 from src.schemas.response import BasicResponse
+from src.schemas.filter import MetadataFilter
 from src.helpers.chat_management_helper import ChatService
 
 from langchain_core.runnables import Runnable, RunnableLambda
@@ -12,16 +13,20 @@ from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, System
 
 import datetime 
 import time
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 # Initialize the chat service
 chat_service = ChatService()
 
 class ChatHandler(LoggerMixin):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        search_retrieval: Optional[SearchRetrieval] = None,
+        llm_generator: Optional[LLMGenerator] = None
+    ) -> None:
         super().__init__()
-        self.search_retrieval = SearchRetrieval()
-        self.llm_generator = LLMGenerator()
+        self.search_retrieval = search_retrieval or SearchRetrieval()
+        self.llm_generator = llm_generator or LLMGenerator()
     
     def create_session_id(self, user_id: str) -> BasicResponse:
         """
@@ -50,13 +55,21 @@ class ChatHandler(LoggerMixin):
                 data=None
             )
 
-    async def _get_chat_flow(self, model_name: str, collection_name: str) -> Tuple[Runnable, Runnable]:
+    async def _get_chat_flow(
+        self,
+        model_name: str,
+        collection_name: str,
+        organization_id: Optional[str] = None,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> Tuple[Runnable, Runnable]:
         """
         Create the chat flow for retrieving context and generating responses
         
         Args:
             model_name: The name of the LLM model to use
             collection_name: The name of the vector collection to query
+            organization_id: The organization used to filter retrieved context
+            metadata_filter: Metadata conditions applied when retrieving context
             
         Returns:
             Tuple[Runnable, Runnable]: The conversation chain and rewrite chain
@@ -70,7 +83,12 @@ class ChatHandler(LoggerMixin):
 
         # Define the retrieval function
         async def retriever_function(query):
-            return await self.search_retrieval.qdrant_retrieval(query=query, collection_name=collection_name)
+            return await self.search_retrieval.qdrant_retrieval(
+                query=query,
+                collection_name=collection_name,
+                organization_id=organization_id,
+                metadata_filter=metadata_filter
+            )
         
         # Format documents function
         def format_docs(docs):
@@ -94,7 +112,10 @@ class ChatHandler(LoggerMixin):
         session_id: str,
         question_input: str,
         model_name: str,
-        collection_name: str
+        collection_name: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        metadata_filter: Optional[MetadataFilter] = None
     ) -> BasicResponse:
         """
         Handle a chat request: retrieve context, generate a response
@@ -104,6 +125,9 @@ class ChatHandler(LoggerMixin):
             question_input: The user's question
             model_name: The LLM model to use
             collection_name: The vector collection to query
+            user_id: The user sending the question
+            organization_id: The organization used to filter retrieved context
+            metadata_filter: Metadata conditions applied when retrieving context
             
         Returns:
             BasicResponse: The response to the chat request
@@ -112,7 +136,9 @@ class ChatHandler(LoggerMixin):
             # Get the chains needed for the chat flow
             conversational_rag_chain, rewrite_chain = await self._get_chat_flow(
                 model_name=model_name, 
-                collection_name=collection_name
+                collection_name=collection_name,
+                organization_id=organization_id,
+                metadata_filter=metadata_filter
             )
 
             # Save the user's question to the database
@@ -1,9 +1,11 @@
 from typing import List, Dict, Any, Optional
+import asyncio
 import numpy as np
 import torch
 from functools import lru_cache
 from src.utils.logger.custom_logging import LoggerMixin
-from src.helpers.model_loader_helper import ModelLoader, sentence_transformer, default_tokenizer
+from src.helpers.micro_batcher_helper import MicroBatcher
+from src.helpers.model_loader_helper import ModelLoader, sentence_transformer, default_tokenizer, RERANK_ENCODE_BATCH_SIZE
 
 class RerankHandler(LoggerMixin):
     """Handler for reranking retrieved documents using local models instead of Triton Server.
@@ -12,14 +14,16 @@ class RerankHandler(LoggerMixin):
     models while maintaining compatibility with the original codebase.
     """
     
-    def __init__(self, model_key: Optional[str] = None):
+    def __init__(self, model_key: Optional[str] = None, batch_size: int = RERANK_ENCODE_BATCH_SIZE):
         """Initialize the reranking handler with a specified model from config.
         
         Args:
             model_key (Optional[str]): Key of the reranking model in config file.
                                       If None, uses the default model.
+            batch_size (int): Texts per forward pass when encoding, RERANK_RUNTIME in model_config.yaml.
         """
         super().__init__()
+        self.batch_size = batch_size
         
         if model_key is None:
             # Use the singleton instance for better performance
@@ -34,6 +38,10 @@ class RerankHandler(LoggerMixin):
         
         # Use the singleton tokenizer
         self.tokenizer = default_tokenizer
+
+        # Texts of concurrent /rerank requests are encoded in one call
+        self.encode_batcher = MicroBatcher(f'rerank-encode-{self.model_name}', self._run_encode_batch)
+        self.batchers = [self.encode_batcher]
     
     def tokenize_input(self, text: str) -> Dict[str, Any]:
         """Tokenizes the input text and prepares it for the model.
@@ -104,6 +112,38 @@ class RerankHandler(LoggerMixin):
             ]
         }
 
+    def encode_batch(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Encodes many texts with batched forward passes of the local model.
+
+        Texts are sorted by length so each batch pads to similar lengths, and the
+        embeddings are returned in the input order.
+
+        Args:
+            texts (List[str]): The input texts.
+            batch_size (Optional[int]): Texts per forward pass, defaults to the handler batch size.
+
+        Returns:
+            np.ndarray: One embedding per text, shape (len(texts), dimension).
+        """
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        with torch.no_grad():
+            sorted_embeddings = self.model.encode(
+                [texts[i] for i in order],
+                batch_size=batch_size or self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+
+    async def _run_encode_batch(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.encode_batch, texts)
+
     def cosine_similarity(self, vec_a: np.ndarray, vec_b: np.ndarray) -> float:
         """Calculates the cosine similarity between two vectors.
 
@@ -135,6 +175,41 @@ class RerankHandler(LoggerMixin):
             return embedding + [0] * (target_size - len(embedding))  # Pad
         return embedding
 
+    def score_embeddings(self, embeddings: np.ndarray, query_embedding: np.ndarray) -> np.ndarray:
+        """Calculates the cosine similarity of every candidate embedding with the query.
+
+        Args:
+            embeddings (np.ndarray): The candidate embeddings, shape (n, dimension).
+            query_embedding (np.ndarray): The embedding of the query.
+
+        Returns:
+            np.ndarray: One score per candidate, 0 for zero vectors.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        # One matrix-vector product, divided by the norms instead of normalizing every row
+        scores = embeddings @ query_embedding
+        norms = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query_embedding)
+        return np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+
+    @staticmethod
+    def rank_scores(scores: np.ndarray, threshold: float, top_k: Optional[int] = None) -> np.ndarray:
+        """Selects the indices of the scores above the threshold, best first.
+
+        Args:
+            scores (np.ndarray): Candidate scores.
+            threshold (float): The minimum score for a candidate to be kept.
+            top_k (Optional[int]): Maximum number of indices to return.
+
+        Returns:
+            np.ndarray: Indices into scores, sorted by descending score.
+        """
+        indices = np.flatnonzero(scores >= threshold)
+        if top_k is not None and top_k < len(indices):
+            # Only the top_k survivors get sorted
+            indices = indices[np.argpartition(-scores[indices], top_k - 1)[:top_k]]
+        return indices[np.argsort(-scores[indices], kind='stable')]
+
     def rerank_embeddings(self, embeddings: List[np.ndarray], query_embedding: np.ndarray, candidates: List) -> List[tuple]:
         """Reranks embeddings based on their similarity to the query embedding.
 
@@ -146,65 +221,70 @@ class RerankHandler(LoggerMixin):
         Returns:
             List[tuple]: A list of ranked documents with their scores.
         """
-        # Calculate similarity scores between query and candidate embeddings
-        scores = {}
-        for candidate, embedding in zip(candidates, embeddings):
-            scores[candidate.doc_id] = self.cosine_similarity(np.array(embedding), np.array(query_embedding))
-       
-        # Sort candidates based on scores in descending order
-        ranked_embeddings = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-     
-        return ranked_embeddings
-
-    def process_candidates(self, candidates: List, query: str, threshold: float) -> List[Dict[str, Any]]:
+        scores = self.score_embeddings(embeddings, query_embedding)
+        return [(candidates[i].doc_id, float(scores[i])) for i in self.rank_scores(scores, -np.inf)]
+
+    def process_candidates(
+        self,
+        candidates: List,
+        query: str,
+        threshold: float,
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """Processes candidate documents against a query and filters based on similarity scores.
 
         Args:
             candidates (List): List of candidate documents with doc_id and content attributes.
             query (str): The query string.
             threshold (float): The minimum score for a candidate to be considered.
+            top_k (Optional[int]): Maximum number of results, all candidates above the threshold if None.
+
+        Returns:
+            List[Dict[str, Any]]: Filtered candidates with their scores.
+        """
+        # Encode the query and all candidates in one batched call; the embeddings
+        # share the model dimension, so they stay numpy arrays without padding
+        embeddings = self.encode_batch([query] + [candidate.content for candidate in candidates])
+        return self._rank_candidates(candidates, embeddings, threshold, top_k)
+
+    async def aprocess_candidates(
+        self,
+        candidates: List,
+        query: str,
+        threshold: float,
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Same as process_candidates, encoding off the event loop together with concurrent requests.
+
+        Args:
+            candidates (List): List of candidate documents with doc_id and content attributes.
+            query (str): The query string.
+            threshold (float): The minimum score for a candidate to be considered.
+            top_k (Optional[int]): Maximum number of results, all candidates above the threshold if None.
 
         Returns:
             List[Dict[str, Any]]: Filtered candidates with their scores.
         """
-        embeddings = []
-
-        # Get embeddings for each candidate
-        for candidate in candidates:
-            resp = self.request_ranking_triton_kserve(candidate.content)
-            embedding = resp.get('outputs', [{}])[0].get("data")
-            if embedding is not None:
-                embeddings.append(np.array(embedding))
-
-        # Get the query embedding
-        query_resp = self.request_ranking_triton_kserve(query)
-        query_embedding = np.array(query_resp.get('outputs', [{}])[0].get("data"))
-
-        # Determine the target size for padding
-        target_size = max(len(embedding) for embedding in embeddings) if embeddings else 0
-
-        # Pad or truncate embeddings to the target size
-        embeddings = [self.pad_or_truncate(embedding.tolist(), target_size) for embedding in embeddings]
-        query_embedding = self.pad_or_truncate(query_embedding.tolist(), target_size)
-
-        # Rerank the embeddings based on the query
-        ranked_results = self.rerank_embeddings(embeddings, query_embedding, candidates)
-
-        # Map the results to the desired output format
-        mapped_results = []
-        for doc_id, score in ranked_results:
-            for candidate in candidates:
-                if candidate.doc_id == doc_id:
-                    mapped_results.append({
-                        'doc_id': doc_id,
-                        'score': score,
-                        'content': candidate.content
-                    })
-                    break
-
-        # Filter results based on the similarity threshold
-        filtered_results = [item for item in mapped_results if item['score'] >= threshold]
-        return filtered_results
-
-# Create a singleton instance for default usage
-default_reranker = RerankHandler()
+        embeddings = await self.encode_batcher.submit([query] + [candidate.content for candidate in candidates])
+        return self._rank_candidates(candidates, np.asarray(embeddings), threshold, top_k)
+
+    def _rank_candidates(
+        self,
+        candidates: List,
+        embeddings: np.ndarray,
+        threshold: float,
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        # embeddings holds the query first, then one row per candidate
+        query_embedding, embeddings = embeddings[0], embeddings[1:]
+
+        # Score, filter and rank as arrays, then map back to the candidates by index
+        scores = self.score_embeddings(embeddings, query_embedding)
+        return [
+            {
+                'doc_id': candidates[i].doc_id,
+                'score': float(scores[i]),
+                'content': candidates[i].content
+            }
+            for i in self.rank_scores(scores, threshold, top_k)
+        ]
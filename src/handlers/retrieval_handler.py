@@ -1,10 +1,24 @@
-from typing import List, Optional
+import time
+import asyncio
+import functools
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 from src.utils.config import settings
 from langchain_core.documents import Document
 from src.helpers.qdrant_connection_helper import QdrantConnection
+from src.helpers.candidate_helper import Candidate
+from src.schemas.filter import MetadataFilter
+from src.helpers.retrieval_config_helper import (
+    CascadeStage,
+    ExpansionMode,
+    FusionMode,
+    get_cascade_models,
+    get_cascade_stages,
+    get_rerank_chunk_size,
+)
 from src.utils.logger.custom_logging import LoggerMixin
 from src.helpers.model_loader_helper import ModelLoader, flag_reranker
+from src.helpers.micro_batcher_helper import MicroBatcher
 
 class SearchRetrieval(LoggerMixin):
     """
@@ -12,16 +26,19 @@ class SearchRetrieval(LoggerMixin):
     Uses singleton pattern to ensure models are loaded only once.
     """
     
-    def __init__(self, model_key: Optional[str] = None):
+    def __init__(self, model_key: Optional[str] = None, qdrant_connection: Optional[QdrantConnection] = None):
         """
         Initialize the search retrieval handler.
         
         Args:
             model_key (Optional[str]): Key of reranking model in config.
                                       If None, uses the default model.
+            qdrant_connection (Optional[QdrantConnection]): Shared Qdrant connection.
+                                      If None, a connection on the shared client is created.
         """
         super().__init__()
-        self.qdrant_client = QdrantConnection()
+        self.qdrant_client = qdrant_connection or QdrantConnection()
+        self.model_key = model_key
         
         if model_key is None:
             # Use singleton instance for better performance
@@ -33,78 +50,391 @@ class SearchRetrieval(LoggerMixin):
             self.model_name = model_key
             
         self.logger.info(f"Using FlagReranker model: {self.model_name}")
+        # Pairs of concurrent requests are scored in one reranker call
+        self.rerank_batcher = MicroBatcher(f'rerank-{self.model_name}', self._run_scores)
+        self.batchers = [self.rerank_batcher]
+        # Cascade stage models: model name -> batcher. The configured ones are loaded here, at
+        # startup, so no request loads a cross-encoder
+        self.stage_batchers: Dict[str, MicroBatcher] = {}
+        for model_key in get_cascade_models():
+            model_name = self._stage_model_name(model_key)
+            if model_name is not None and model_name not in self.stage_batchers:
+                self._add_stage_batcher(model_key, model_name, ModelLoader.get_flag_reranker(model_name))
+        # Reranker latency per model: calls, pairs, seconds
+        self.rerank_timings: Dict[str, List[float]] = {}
     
-    def _query_retrieval_reranking(self, candidates: List[Document], query: str, threshold=0.06) -> List[Document]:
+    async def _progressive_reranking(
+            self,
+            candidates: List[Candidate],
+            query: str,
+            threshold: float,
+            top_k: int,
+            deadline: Optional[float] = None
+        ) -> List[Candidate]:
         """
-        Rerank the candidate documents based on their relevance to the query.
+        Rerank the candidates chunk by chunk, in fusion order, and stop as soon as the
+        remaining candidates cannot change the result.
         
         Args:
-            candidates (List[Document]): List of retrieved documents
+            candidates (List[Candidate]): List of retrieved candidates, best fusion score first
             query (str): Query string
             threshold (float): Minimum score threshold
+            top_k (int): Number of results the caller needs
+            deadline (Optional[float]): time.monotonic() after which no chunk is scored
             
         Returns:
-            List[Document]: Reranked and filtered documents
+            List[Candidate]: Reranked and filtered candidates
         """
-        if candidates:
-            query_docs_pair = []
-            for candidate in candidates:
-                query_docs_pair.append([query, candidate.page_content.strip()])
+        chunk_size = get_rerank_chunk_size(top_k)
+        scores = np.empty(len(candidates), dtype=np.float32)
+        scored = 0
+        while scored < len(candidates):
+            if deadline is not None and time.monotonic() >= deadline:
+                # Out of time before any chunk: the fusion order is the best ranking available
+                if scored == 0:
+                    return candidates
+                break
 
-            scores = self.reranker.compute_score(query_docs_pair, normalize=True)
-            if len(query_docs_pair) == 1:
-                scores = np.array([scores])
-            else:
-                scores = np.array(scores)
-            
-            # Sorted scores and indices
-            sorted_indices = sorted(range(len(scores)), key=lambda x: scores[x], reverse=True)
-            sorted_scores = [scores[i] for i in sorted_indices]
-            
-            filtered_indices = [index for index, score in zip(sorted_indices, sorted_scores) if score >= threshold]
-            rerank_content = [query_docs_pair[index][1] for index in filtered_indices]
-            
-            content_to_results_map = {candidate.page_content.strip(): candidate for candidate in candidates}
+            chunk = candidates[scored:scored + chunk_size]
+            chunk_scores = await self._acompute_scores([[query, candidate.page_content.strip()] for candidate in chunk])
+            scores[scored:scored + len(chunk)] = chunk_scores
+            scored += len(chunk)
+
+            # Lower-ranked candidates come next, so a chunk that does not reach the current
+            # top_k means the rest of the list is not worth scoring
+            kept_scores = np.sort(scores[:scored][scores[:scored] >= threshold])[::-1]
+            if len(kept_scores) >= top_k and chunk_scores.max() < kept_scores[top_k - 1]:
+                break
+
+        if scored < len(candidates):
+            self.logger.debug(f'event=rerank-early-stop message="Scored {scored} of {len(candidates)} candidates"')
+        return self._select_reranked(candidates[:scored], scores[:scored], threshold)
+
+    @staticmethod
+    def _remaining_seconds(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    def _compute_scores(self, query_docs_pair: List[List[str]], reranker: Optional[Any] = None) -> np.ndarray:
+        """
+        Score (query, passage) pairs with the reranker in a single call.
+        
+        Args:
+            query_docs_pair (List[List[str]]): Pairs of query and passage
+            reranker (Optional[Any]): Reranker of a cascade stage, the handler reranker if None
             
-            final_results = [content_to_results_map[content] for content in rerank_content if content in content_to_results_map]
+        Returns:
+            np.ndarray: Normalized relevance score of each pair
+        """
+        scores = (reranker or self.reranker).compute_score(query_docs_pair, normalize=True)
+        return np.atleast_1d(np.asarray(scores, dtype=np.float32))
+
+    async def _run_scores(self, query_docs_pair: List[List[str]], reranker: Optional[Any] = None) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._compute_scores, query_docs_pair, reranker)
+
+    async def _acompute_scores(self, query_docs_pair: List[List[str]], model_key: Optional[str] = None) -> np.ndarray:
+        """
+        Score (query, passage) pairs off the event loop, batched with the pairs of concurrent requests.
+        
+        Args:
+            query_docs_pair (List[List[str]]): Pairs of query and passage
+            model_key (Optional[str]): Reranker of a cascade stage, the handler reranker if None
             
-            return final_results
+        Returns:
+            np.ndarray: Normalized relevance score of each pair
+        """
+        batcher, model_name = await self._stage_batcher(model_key)
+        start = time.perf_counter()
+        scores = np.asarray(await batcher.submit(query_docs_pair), dtype=np.float32)
+        self._record_timing(model_name, len(query_docs_pair), time.perf_counter() - start)
+        return scores
+
+    def _stage_model_name(self, model_key: str) -> Optional[str]:
+        # Model name of a stage, None when it is the handler reranker
+        model_name = ModelLoader._resolve_model_name(model_key, "BAAI_COLLECTION_RERANK")
+        if model_name == ModelLoader._resolve_model_name(self.model_key, "BAAI_COLLECTION_RERANK"):
+            return None
+        return model_name
+
+    def _add_stage_batcher(self, model_key: str, model_name: str, reranker: Any) -> MicroBatcher:
+        batcher = MicroBatcher(f'rerank-{model_key}', functools.partial(self._run_scores, reranker=reranker))
+        self.stage_batchers[model_name] = batcher
+        self.batchers.append(batcher)
+        return batcher
+
+    async def _stage_batcher(self, model_key: Optional[str] = None) -> Tuple[MicroBatcher, str]:
+        model_name = None if model_key is None else self._stage_model_name(model_key)
+        if model_name is None:
+            return self.rerank_batcher, ModelLoader._resolve_model_name(self.model_key, "BAAI_COLLECTION_RERANK")
+
+        if model_name not in self.stage_batchers:
+            # A stage outside the configured cascades: loaded off the event loop
+            loop = asyncio.get_running_loop()
+            reranker = await loop.run_in_executor(None, ModelLoader.get_flag_reranker, model_name)
+            if model_name not in self.stage_batchers:
+                self._add_stage_batcher(model_key, model_name, reranker)
+        return self.stage_batchers[model_name], model_name
+
+    def _record_timing(self, model_name: str, pairs: int, seconds: float) -> None:
+        timings = self.rerank_timings.setdefault(model_name, [0, 0, 0.0])
+        timings[0] += 1
+        timings[1] += pairs
+        timings[2] += seconds
+
+    def rerank_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Latency of each reranker model used by this handler (all stages of a cascade).
         
-        return candidates
+        Returns:
+            Dict[str, Dict[str, Any]]: Calls, mean pairs and mean milliseconds per call of each model
+        """
+        return {
+            model_name: {
+                'calls': calls,
+                'mean_pairs': round(pairs / calls, 2),
+                'mean_ms': round(seconds * 1000 / calls, 2),
+            }
+            for model_name, (calls, pairs, seconds) in self.rerank_timings.items()
+        }
+
+    async def _cascade_reranking(
+            self,
+            candidates: List[Candidate],
+            query: str,
+            threshold: float,
+            top_k: int,
+            stages: Tuple[CascadeStage, ...],
+            deadline: Optional[float] = None
+        ) -> List[Candidate]:
+        """
+        Rerank the candidates with a cascade of rerankers, cheapest first. Every stage but
+        the last keeps its best max(keep, top_k) candidates for the next one; the last stage
+        ranks the survivors and applies the threshold.
+        
+        Args:
+            candidates (List[Candidate]): List of retrieved candidates, best fusion score first
+            query (str): Query string
+            threshold (float): Minimum score threshold of the last stage
+            top_k (int): Number of results the caller needs
+            stages (Tuple[CascadeStage, ...]): Cascade stages, in order
+            deadline (Optional[float]): time.monotonic() after which no stage is started
+            
+        Returns:
+            List[Candidate]: Reranked and filtered candidates
+        """
+        survivors = candidates
+        stage_timings = []
+        for position, stage in enumerate(stages):
+            if not survivors:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                # Out of time: the ranking of the last finished stage is the best available
+                self.logger.warning(f'event=rerank-deadline message="Cascade stopped before stage {stage.model}"')
+                break
+
+            start = time.perf_counter()
+            scores = await self._acompute_scores(
+                [[query, candidate.page_content.strip()] for candidate in survivors], stage.model
+            )
+            stage_timings.append(f'{stage.model}:{len(survivors)}:{(time.perf_counter() - start) * 1000:.1f}ms')
+
+            if position == len(stages) - 1:
+                survivors = self._select_reranked(survivors, scores, threshold)
+            else:
+                keep = max(stage.keep, top_k)
+                survivors = [survivors[index] for index in np.argsort(-scores, kind='stable')[:keep]]
+
+        self.logger.debug(f'event=rerank-cascade message="Cascade stages (model:pairs:latency) {stage_timings}"')
+        return survivors
+
+    @staticmethod
+    def _select_reranked(candidates: List[Candidate], scores: np.ndarray, threshold: float) -> List[Candidate]:
+        # Stable sort by descending score, keeping candidates above the threshold
+        sorted_indices = np.argsort(-scores, kind='stable')
+        return [candidates[index] for index in sorted_indices if scores[index] >= threshold]
 
 
     async def qdrant_retrieval(
             self, 
             query: str | dict,
             top_k: int = 5,
-            collection_name: str = settings.QDRANT_COLLECTION_NAME
+            collection_name: str | List[str] = settings.QDRANT_COLLECTION_NAME,
+            organization_id: Optional[str] = None,
+            fusion: Optional[FusionMode] = None,
+            dense_prefetch_limit: Optional[int] = None,
+            sparse_prefetch_limit: Optional[int] = None,
+            deadline_ms: Optional[int] = None,
+            expansion: Optional[ExpansionMode] = None,
+            window: Optional[int] = None,
+            token_budget: Optional[int] = None,
+            metadata_filter: Optional[MetadataFilter] = None,
+            cascade: Optional[bool] = None
         ) -> Optional[List[Document]]:
         """
         Retrieve documents from Qdrant, rerank them, and return the top results.
+        Several collections are searched concurrently and reranked together.
+        The search depth follows top_k, reranking stops early once extra candidates cannot
+        change the result (or runs the cascade of the collection), and only the top_k best
+        sections are expanded. With a deadline, reranking and section expansion are skipped
+        when the time runs out.
+        Complete results are kept in the semantic cache, so a near-duplicate query with the
+        same options skips search, reranking and expansion.
         
         Args:
             query (str | dict): Query string or dict with query field
             top_k (int): Number of top results to return
-            collection_name (str): Name of the collection to search
+            collection_name (str | List[str]): Name of the collection(s) to search
+            organization_id (Optional[str]): Organization used to filter the points
+            fusion (Optional[FusionMode]): Fusion mode, defaults to the one of the collection in retrieval_config.yaml
+            dense_prefetch_limit (Optional[int]): Dense candidates to prefetch, defaults to the collection config
+            sparse_prefetch_limit (Optional[int]): BM25 candidates to prefetch, defaults to the collection config
+            deadline_ms (Optional[int]): Latency budget of the retrieval in milliseconds
+            expansion (Optional[ExpansionMode]): Whole sections or neighbour windows, defaults to the collection config
+            window (Optional[int]): Neighbours on each side of a hit in window mode
+            token_budget (Optional[int]): Estimated tokens per section in window mode
+            metadata_filter (Optional[MetadataFilter]): Document, extension and date conditions applied in the search
+            cascade (Optional[bool]): Cascade reranking on or off, defaults to the collection config
             
         Returns:
             Optional[List[Document]]: Retrieved and reranked documents
         """
         if type(query) == dict:
             query = query.get('query')
+        deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000
+
+        collection_names = tuple([collection_name] if isinstance(collection_name, str) else collection_name)
+        # A federated search is reranked once, with the cascade of its first collection. Resolved
+        # before the search, so a cascade requested without stages is not swallowed below.
+        cascade_stages = get_cascade_stages(collection_names[0], cascade)
 
         try:
-            docs = await self.qdrant_client.hybrid_search(query=query, collection_name=collection_name) 
-            docs = self._query_retrieval_reranking(docs, query, 0.3)
-            extended_docs = await self.qdrant_client.query_headers(docs, collection_name)
+            cache_partition = (
+                self.model_name, collection_names, organization_id, top_k, fusion,
+                dense_prefetch_limit, sparse_prefetch_limit, expansion, window, token_budget,
+                metadata_filter.json() if metadata_filter is not None else None, cascade
+            )
+            query_vector = None
+            if settings.SEMANTIC_CACHE_ENABLED:
+                # The dense vector lands in the query embedding cache, so hybrid_search does not encode it again
+                query_vector = (await self.qdrant_client.query_encoder.aencode(query, ('dense',))).dense
+                # Taken before the search: a write to the collections meanwhile keeps the result out of the cache
+                cache_generation = self.qdrant_client.retrieval_cache.generation(collection_names)
+                cached_docs = self.qdrant_client.retrieval_cache.get(cache_partition, query_vector)
+                if cached_docs is not None:
+                    self.logger.debug('event=semantic-cache-hit message="Returning cached retrieval results"')
+                    return [candidate.to_document(organization_id) for candidate in cached_docs]
+
+            docs = await asyncio.wait_for(
+                self.qdrant_client.hybrid_search(
+                    query=query,
+                    collection_name=collection_name,
+                    organization_id=organization_id,
+                    fusion=fusion,
+                    dense_prefetch_limit=dense_prefetch_limit,
+                    sparse_prefetch_limit=sparse_prefetch_limit,
+                    top_k=top_k,
+                    metadata_filter=metadata_filter
+                ),
+                timeout=self._remaining_seconds(deadline)
+            )
+            if cascade_stages:
+                docs = await self._cascade_reranking(docs, query, 0.3, top_k, cascade_stages, deadline)
+            else:
+                docs = await self._progressive_reranking(docs, query, 0.3, top_k, deadline)
+            try:
+                extended_docs = await asyncio.wait_for(
+                    self.qdrant_client.query_headers(
+                        docs,
+                        collection_name,
+                        organization_id,
+                        max_sections=top_k,
+                        expansion=expansion,
+                        window=window,
+                        token_budget=token_budget
+                    ),
+                    timeout=self._remaining_seconds(deadline)
+                )
+            except asyncio.TimeoutError:
+                # Out of time: return the reranked chunks without their sections
+                self.logger.warning(f'event=retrieval-deadline message="Section expansion skipped after {deadline_ms} ms"')
+                extended_docs = docs
+                query_vector = None
             self.logger.debug("############### docs ########### %s", docs)
             self.logger.debug("############### extended_docs ########### %s", extended_docs)
-            return extended_docs[:top_k] 
+            # Results cut short by the deadline are not cached
+            if query_vector is not None and extended_docs and self._remaining_seconds(deadline) != 0:
+                self.qdrant_client.retrieval_cache.put(
+                    cache_partition, collection_names, query_vector, extended_docs[:top_k], cache_generation
+                )
+            # Candidates become Documents only when they leave the retrieval
+            return [candidate.to_document(organization_id) for candidate in extended_docs[:top_k]]
+        except asyncio.TimeoutError:
+            self.logger.warning(f'event=retrieval-deadline message="Search did not finish within {deadline_ms} ms"')
+            return []
         except Exception as e:
             self.logger.error('event=query-relevant-context-in-database '
                              'message="Failed to retrieve relevant context from database"'
                              f'error={e}')
             return []
 
-# Create a singleton instance for default usage
-default_search_retrieval = SearchRetrieval()
+    async def qdrant_retrieval_batch(
+            self,
+            queries: List[str],
+            top_k: int | List[int] = 5,
+            collection_name: str = settings.QDRANT_COLLECTION_NAME,
+            organization_id: Optional[str] = None
+        ) -> List[List[Document]]:
+        """
+        Retrieve, rerank and expand documents for many queries at once.
+        
+        All queries are embedded in one batched encoder call, searched with a single
+        batched Qdrant request and reranked with one cross-encoder call over every
+        (query, passage) pair.
+        
+        Args:
+            queries (List[str]): Query strings
+            top_k (int | List[int]): Number of results to return, shared or per query
+            collection_name (str): Name of the collection to search
+            organization_id (Optional[str]): Organization used to filter the points
+            
+        Returns:
+            List[List[Document]]: Retrieved documents for each query, in query order
+        """
+        top_ks = top_k if isinstance(top_k, list) else [top_k] * len(queries)
+        if len(top_ks) != len(queries):
+            raise ValueError("top_k must be an int or a list with one value per query")
+
+        try:
+            batch_docs = await self.qdrant_client.hybrid_search_batch(
+                queries=queries,
+                collection_name=collection_name,
+                organization_id=organization_id
+            )
+
+            query_docs_pair = [
+                [query, doc.page_content.strip()]
+                for query, docs in zip(queries, batch_docs)
+                for doc in docs
+            ]
+            scores = await self._acompute_scores(query_docs_pair)
+
+            # Split the flat score array back into one slice per query
+            reranked_docs = []
+            offset = 0
+            for docs in batch_docs:
+                reranked_docs.append(self._select_reranked(docs, scores[offset:offset + len(docs)], 0.3))
+                offset += len(docs)
+
+            extended_docs = await asyncio.gather(*[
+                self.qdrant_client.query_headers(docs, collection_name, organization_id, max_sections=k)
+                for docs, k in zip(reranked_docs, top_ks)
+            ])
+            return [
+                [candidate.to_document(organization_id) for candidate in docs[:k]]
+                for docs, k in zip(extended_docs, top_ks)
+            ]
+        except Exception as e:
+            self.logger.error('event=batch-query-relevant-context-in-database '
+                             'message="Failed to retrieve relevant context from database"'
+                             f'error={e}')
+            return [[] for _ in queries]
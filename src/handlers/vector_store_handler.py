@@ -1,16 +1,17 @@
 from typing import Dict, Any, Optional, List
 from src.utils.logger.custom_logging import LoggerMixin
-from src.helpers.qdrant_connection_helper import QdrantConnection
+from src.utils.config import settings
+from src.helpers.qdrant_connection_helper import QdrantConnection, tenant_collection_name
 from src.schemas.response import BasicResponse
 from src.database.services.collection_management_service import CollectionManagementService
 
 class VectorStoreQdrant(LoggerMixin):
-    def __init__(self) -> None:
+    def __init__(self, qdrant_connection: Optional[QdrantConnection] = None) -> None:
         super().__init__()
-        self.qdrant = QdrantConnection()
+        self.qdrant = qdrant_connection or QdrantConnection()
         self.collection_service = CollectionManagementService()
 
-    def create_qdrant_collection(
+    async def create_qdrant_collection(
         self, 
         collection_name: str, 
         user: Dict[str, Any],
@@ -35,13 +36,14 @@ class VectorStoreQdrant(LoggerMixin):
         
         try:
             # Tạo tên collection đặc biệt nếu có organization_id
-            effective_collection_name = collection_name
-            if organization_id:
-                effective_collection_name = f"{collection_name}_{organization_id}"
+            effective_collection_name = tenant_collection_name(collection_name, organization_id)
+            # A shared collection may already exist for other organizations
+            shared_collection = settings.QDRANT_TENANCY_MODE == 'shared' and organization_id is not None
                 
-            if not self.qdrant.client.collection_exists(collection_name=effective_collection_name):
+            collection_exists = await self.qdrant.collection_exists(effective_collection_name)
+            if not collection_exists or shared_collection:
                 # 1. Tạo collection trong Qdrant vector database
-                is_created = self.qdrant._create_collection(effective_collection_name)
+                is_created = collection_exists or await self.qdrant._create_collection(effective_collection_name)
                 
                 if is_created:
                     # 2. Lưu metadata vào PostgreSQL
@@ -82,7 +84,7 @@ class VectorStoreQdrant(LoggerMixin):
                 data=None
             )
         
-    def delete_qdrant_collection(
+    async def delete_qdrant_collection(
         self, 
         collection_name: str, 
         user: Dict[str, Any],
@@ -101,12 +103,10 @@ class VectorStoreQdrant(LoggerMixin):
         """
         try:
             # Áp dụng organization_id vào tên collection nếu có
-            effective_collection_name = collection_name
-            if organization_id:
-                effective_collection_name = f"{collection_name}_{organization_id}"
+            effective_collection_name = tenant_collection_name(collection_name, organization_id)
             
             # 1. Kiểm tra xem collection có tồn tại trong Qdrant không
-            if self.qdrant.client.collection_exists(collection_name=effective_collection_name):
+            if await self.qdrant.collection_exists(effective_collection_name):
                 # 2. Kiểm tra quyền sở hữu qua PostgreSQL
                 is_owner = self.collection_service.is_collection_owner(
                     user_id=user["id"], 
@@ -120,7 +120,11 @@ class VectorStoreQdrant(LoggerMixin):
                 
                 if is_owner:
                     # 3. Xóa collection từ Qdrant
-                    self.qdrant._delete_collection(effective_collection_name)
+                    if settings.QDRANT_TENANCY_MODE == 'shared' and organization_id:
+                        # Other organizations keep their points in the shared collection
+                        await self.qdrant.delete_organization_points(effective_collection_name, organization_id)
+                    else:
+                        await self.qdrant._delete_collection(effective_collection_name)
                     
                     # 4. Xóa metadata từ PostgreSQL
                     try:
@@ -156,7 +160,7 @@ class VectorStoreQdrant(LoggerMixin):
                 data=None
             )
     
-    def list_qdrant_collections(
+    async def list_qdrant_collections(
         self, 
         user: Dict[str, Any] = None,
         organization_id: Optional[str] = None
@@ -173,13 +177,13 @@ class VectorStoreQdrant(LoggerMixin):
         """
         try:
             # 1. Lấy danh sách tất cả collection từ Qdrant
-            collections = self.qdrant.client.get_collections().collections
+            collections = (await self.qdrant.client.get_collections()).collections
             all_collection_names = [c.name for c in collections]
             
             # Nếu user là admin, trả về tất cả collection
             if user.get("is_admin", False):
                 # Nếu có organization_id, lọc các collection thuộc về tổ chức đó
-                if organization_id:
+                if organization_id and settings.QDRANT_TENANCY_MODE == 'per_collection':
                     return [c for c in all_collection_names if c.endswith(f"_{organization_id}")]
                 return all_collection_names
             
@@ -0,0 +1,59 @@
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from langchain_core.documents import Document
+
+
+# Payload fields every retrieval stage needs, the only ones requested from Qdrant
+CANDIDATE_PAYLOAD_FIELDS: List[str] = [
+    "page_content",
+    "metadata.document_name",
+    "metadata.headers",
+    "metadata.document_id",
+    "metadata.index",
+]
+
+
+class Candidate(NamedTuple):
+    """
+    Retrieved chunk (or expanded section) passed between the retrieval stages.
+
+    A tuple instead of a LangChain Document keeps each result to one small allocation;
+    it is turned into a Document only when it leaves SearchRetrieval.
+    """
+    id: Optional[str]
+    score: float
+    page_content: str
+    document_name: Optional[str] = None
+    headers: Optional[str] = None
+    document_id: Optional[str] = None
+    index: Optional[int] = None
+    collection_name: Optional[str] = None
+
+    @classmethod
+    def from_payload(cls, point_id: Any, score: float, payload: Dict[str, Any], collection_name: Optional[str] = None) -> "Candidate":
+        metadata = payload.get('metadata', {})
+        return cls(
+            id=str(point_id),
+            score=score,
+            page_content=payload['page_content'],
+            document_name=metadata.get('document_name'),
+            headers=metadata.get('headers'),
+            document_id=metadata.get('document_id'),
+            index=metadata.get('index'),
+            collection_name=collection_name,
+        )
+
+    def to_document(self, organization_id: Optional[str] = None) -> Document:
+        metadata = {
+            'document_name': self.document_name,
+            'headers': self.headers,
+            'document_id': self.document_id,
+            'collection_name': self.collection_name,
+        }
+        if self.index is not None:
+            metadata['index'] = self.index
+
+        # Thêm organization_id vào metadata nếu có
+        if organization_id:
+            metadata['organization_id'] = organization_id
+        return Document(page_content=self.page_content, metadata=metadata)
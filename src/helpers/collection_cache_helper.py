@@ -0,0 +1,80 @@
+import time
+import asyncio
+from typing import Any, Dict, NamedTuple, Optional
+
+from qdrant_client import AsyncQdrantClient
+
+from src.utils.config import settings
+
+
+class CollectionMetadata(NamedTuple):
+    exists: bool
+    points_count: int = 0
+    vectors_config: Optional[Any] = None
+    sparse_vectors_config: Optional[Any] = None
+
+
+class CollectionMetadataCache:
+    """
+    TTL cache of Qdrant collection metadata (existence, point count, vector config).
+
+    Keeps control-plane calls (collection_exists / get_collection) off the retrieval
+    path. Entries are invalidated explicitly whenever a collection is created, deleted
+    or its points change. Missing collections are only cached for a short time because
+    another worker may create them.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.COLLECTION_METADATA_CACHE_TTL,
+        missing_ttl_seconds: float = 5
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.missing_ttl_seconds = missing_ttl_seconds
+        self._entries: Dict[str, tuple] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, collection_name: str) -> Optional[CollectionMetadata]:
+        entry = self._entries.get(collection_name)
+        if entry is None:
+            return None
+        fetched_at, metadata = entry
+        ttl = self.ttl_seconds if metadata.exists else self.missing_ttl_seconds
+        if time.monotonic() - fetched_at > ttl:
+            return None
+        return metadata
+
+    async def get(self, client: AsyncQdrantClient, collection_name: str) -> CollectionMetadata:
+        metadata = self._fresh(collection_name)
+        if metadata is not None:
+            return metadata
+
+        # Concurrent misses for the same collection share a single round trip
+        lock = self._locks.setdefault(collection_name, asyncio.Lock())
+        async with lock:
+            metadata = self._fresh(collection_name)
+            if metadata is not None:
+                return metadata
+
+            if await client.collection_exists(collection_name=collection_name):
+                info = await client.get_collection(collection_name=collection_name)
+                metadata = CollectionMetadata(
+                    exists=True,
+                    points_count=int(info.points_count or 0),
+                    vectors_config=info.config.params.vectors,
+                    sparse_vectors_config=info.config.params.sparse_vectors,
+                )
+            else:
+                metadata = CollectionMetadata(exists=False)
+            self._entries[collection_name] = (time.monotonic(), metadata)
+            return metadata
+
+    def invalidate(self, collection_name: Optional[str] = None) -> None:
+        if collection_name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(collection_name, None)
+
+
+# Shared by every QdrantConnection of the process
+collection_metadata_cache = CollectionMetadataCache()
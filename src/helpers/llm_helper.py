@@ -1,3 +1,4 @@
+from typing import Dict, Tuple
 from langchain_community.chat_models import ChatOllama
 from src.utils.logger.custom_logging import LoggerMixin
 from src.utils.config import settings
@@ -5,8 +6,12 @@ from src.utils.config import settings
 class LLMGenerator(LoggerMixin):
     def __init__(self):
         super().__init__()
+        # Ollama chat clients are reused across requests, one per (model, base_url)
+        self._llms: Dict[Tuple[str, str], ChatOllama] = {}
 
     async def get_llm(self, model: str, base_url: str = settings.OLLAMA_ENDPOINT):
+        if (model, base_url) in self._llms:
+            return self._llms[(model, base_url)]
         try:
             llm = ChatOllama(base_url=base_url,
                             model=model,
@@ -15,9 +20,13 @@ class LLMGenerator(LoggerMixin):
                             top_p=0.5,
                             # num_ctx=8000, 
                             streaming=True)
+            self._llms[(model, base_url)] = llm
      
         except Exception as e:
             self.logger.error(f"Error: {str(e)}")
         return llm
 
+    def clear(self) -> None:
+        self._llms.clear()
+
 
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.config import settings
+from src.utils.config_loader import ConfigReaderInstance
+from src.utils.logger.custom_logging import LoggerMixin
+
+model_config = ConfigReaderInstance.yaml.read_config_from_file(settings.MODEL_CONFIG_FILENAME)
+INFERENCE_BATCHING = model_config.get('INFERENCE_BATCHING') or {}
+INFERENCE_BATCHING_ENABLED = bool(INFERENCE_BATCHING.get('ENABLED', True))
+INFERENCE_MAX_BATCH_SIZE = int(INFERENCE_BATCHING.get('MAX_BATCH_SIZE') or 64)
+INFERENCE_MAX_WAIT_MS = float(INFERENCE_BATCHING.get('MAX_WAIT_MS') or 3)
+
+
+class MicroBatcher(LoggerMixin):
+    """
+    Collects the inputs of concurrent requests into one model call.
+
+    The first waiting request opens a window of max_wait_ms; requests arriving within it
+    join the batch until max_batch_size inputs are collected. run_batch gets the inputs
+    of the whole batch in arrival order and must return one result per input, which are
+    split back to the callers. One batch runs at a time, and requests arriving meanwhile
+    form the next one, so batches grow with the load. The worker starts with the
+    ResourceRegistry, or on the first submit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[Any]], Awaitable[Sequence[Any]]],
+        max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+        enabled: bool = INFERENCE_BATCHING_ENABLED
+    ):
+        super().__init__()
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.enabled = enabled
+        self.batches = 0
+        self.items = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: List[Tuple[List[Any], asyncio.Future]] = []
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run(), name=f'micro-batcher-{self.name}')
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        pending = self._in_flight + [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+        for _, future in pending:
+            if not future.done():
+                future.cancel()
+        self._in_flight = []
+        self._worker, self._queue = None, None
+
+    async def submit(self, items: List[Any]) -> Sequence[Any]:
+        # The results of this caller's items, in order
+        if not items:
+            return []
+        if not self.enabled:
+            return await self.run_batch(items)
+
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((items, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self._queue.get()]
+            size = len(requests[0][0])
+            flush_at = loop.time() + self.max_wait_ms / 1000
+            while size < self.max_batch_size:
+                timeout = flush_at - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                requests.append(request)
+                size += len(request[0])
+            self._in_flight = requests
+            await self._process(requests)
+            self._in_flight = []
+
+    async def _process(self, requests: List[Tuple[List[Any], asyncio.Future]]) -> None:
+        items = [item for request_items, _ in requests for item in request_items]
+        try:
+            results = await self.run_batch(items)
+        except Exception as e:
+            self.logger.error(f'event=micro-batch-failed message="{self.name} batch of {len(items)} failed" error={e}')
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(items)
+        offset = 0
+        for request_items, future in requests:
+            # Callers that gave up (deadline, cancelled request) are skipped
+            if not future.done():
+                future.set_result(results[offset:offset + len(request_items)])
+            offset += len(request_items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 import torch
 from transformers import AutoTokenizer
 from sentence_transformers import SentenceTransformer
@@ -7,10 +7,13 @@ from FlagEmbedding import FlagReranker
 from src.utils.config import settings
 from src.utils.config_loader import ConfigReaderInstance
 from src.utils.logger.custom_logging import LoggerMixin
+from src.helpers.onnx_reranker_helper import OnnxReranker, RERANKER_BACKEND, RERANKER_USE_FP16
 
 # Load configuration
 config = ConfigReaderInstance.yaml.read_config_from_file(settings.MODEL_CONFIG_FILENAME)
 rerank_config = config.get('RERANKING_MODEL', {})
+rerank_runtime_config = config.get('RERANK_RUNTIME') or {}
+RERANK_ENCODE_BATCH_SIZE = int(rerank_runtime_config.get('ENCODE_BATCH_SIZE') or 32)
 
 # Define cache directory for models
 CACHE_DIR = "/app/cache"
@@ -23,23 +26,28 @@ class ModelLoader(LoggerMixin):
     
     @staticmethod
     @lru_cache(maxsize=5)
-    def get_flag_reranker(model_key: Optional[str] = None) -> FlagReranker:
+    def get_flag_reranker(model_key: Optional[str] = None, backend: str = RERANKER_BACKEND) -> Union[FlagReranker, OnnxReranker]:
         """
-        Load and cache a FlagReranker model.
+        Load and cache a cross-encoder reranker.
         
         Args:
             model_key (Optional[str]): Key of model in config or direct model name
+            backend (str): torch (FlagReranker) or onnx_int8 (int8 ONNX graph on onnxruntime)
             
         Returns:
-            FlagReranker: Loaded model
+            Union[FlagReranker, OnnxReranker]: Loaded model, both expose compute_score
         """
         logger = ModelLoader().logger
         
         # Determine model name based on key or default
         model_name = ModelLoader._resolve_model_name(model_key, "BAAI_COLLECTION_RERANK")
         
+        if backend == "onnx_int8":
+            logger.info(f"Loading int8 ONNX reranker model: {model_name}")
+            return OnnxReranker(model_name, cache_dir=CACHE_DIR)
+
         logger.info(f"Loading FlagReranker model: {model_name}")
-        return FlagReranker(model_name, use_fp16=True)
+        return FlagReranker(model_name, use_fp16=RERANKER_USE_FP16)
     
     @staticmethod
     @lru_cache(maxsize=5)
@@ -0,0 +1,142 @@
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import onnxruntime as ort
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+from src.utils.config import settings
+from src.utils.config_loader import ConfigReaderInstance
+from src.utils.logger.custom_logging import LoggerMixin
+
+model_config = ConfigReaderInstance.yaml.read_config_from_file(settings.MODEL_CONFIG_FILENAME)
+RERANKER_BACKEND_CONFIG = model_config.get('RERANKER_BACKEND') or {}
+RERANKER_BACKEND = RERANKER_BACKEND_CONFIG.get('BACKEND') or 'torch'
+RERANKER_USE_FP16 = bool(RERANKER_BACKEND_CONFIG.get('USE_FP16', True))
+RERANKER_ONNX_DIR = RERANKER_BACKEND_CONFIG.get('ONNX_DIR') or '/app/cache/onnx'
+RERANKER_MAX_LENGTH = int(RERANKER_BACKEND_CONFIG.get('MAX_LENGTH') or 512)
+RERANKER_BATCH_SIZE = int(RERANKER_BACKEND_CONFIG.get('BATCH_SIZE') or 32)
+RERANKER_INTRA_OP_THREADS = int(
+    RERANKER_BACKEND_CONFIG.get('INTRA_OP_THREADS') or max(1, (os.cpu_count() or 1) // settings.UVICORN_WORKERS)
+)
+RERANKER_INTER_OP_THREADS = int(RERANKER_BACKEND_CONFIG.get('INTER_OP_THREADS') or 1)
+
+# Inputs of the exported graph, in the positional order of the Hugging Face forward()
+MODEL_INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+def export_quantized_reranker(model_name: str, onnx_dir: str = RERANKER_ONNX_DIR, cache_dir: Optional[str] = None) -> str:
+    """
+    Export a sequence classification reranker to ONNX and quantize its weights to int8.
+
+    The graph is written once under onnx_dir and reused afterwards. Dynamic quantization
+    stores the MatMul weights as int8 and quantizes the activations at run time, so no
+    calibration data is needed.
+
+    Returns:
+        str: Path of the int8 ONNX graph
+    """
+    model_dir = os.path.join(onnx_dir, model_name.replace('/', '__'))
+    quantized_path = os.path.join(model_dir, 'model.int8.onnx')
+    if os.path.exists(quantized_path):
+        return quantized_path
+
+    # torch and transformers are only needed for the one-off export
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, cache_dir=cache_dir).eval()
+    sample = tokenizer(['what is onnx'], ['ONNX is an open format for machine learning models.'], return_tensors='pt')
+    input_names = [name for name in MODEL_INPUT_NAMES if name in sample]
+
+    float_path = os.path.join(model_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            float_path,
+            input_names=input_names,
+            output_names=['logits'],
+            dynamic_axes={
+                **{name: {0: 'batch', 1: 'sequence'} for name in input_names},
+                'logits': {0: 'batch'},
+            },
+            opset_version=17,
+        )
+    quantize_dynamic(float_path, quantized_path, weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(model_dir)
+    return quantized_path
+
+
+class OnnxReranker(LoggerMixin):
+    """
+    Cross-encoder reranker running an int8 ONNX graph on onnxruntime (CPU).
+
+    Drop-in for FlagReranker.compute_score: pairs are scored in batches sorted by length,
+    and normalize=True applies the same sigmoid to the logits.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        onnx_dir: str = RERANKER_ONNX_DIR,
+        max_length: int = RERANKER_MAX_LENGTH,
+        batch_size: int = RERANKER_BATCH_SIZE,
+        intra_op_threads: int = RERANKER_INTRA_OP_THREADS,
+        inter_op_threads: int = RERANKER_INTER_OP_THREADS,
+        cache_dir: Optional[str] = None
+    ):
+        super().__init__()
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = max_length
+        self.batch_size = batch_size
+        model_path = export_quantized_reranker(model_name, onnx_dir, cache_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = intra_op_threads
+        session_options.inter_op_num_threads = inter_op_threads
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=session_options, providers=['CPUExecutionProvider'])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.logger.info(f'event=onnx-reranker-loaded message="Loaded int8 ONNX reranker {model_name} from {model_path}"')
+
+    def _score_batch(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        encoded = self.tokenizer(
+            [query for query, _ in pairs],
+            [passage for _, passage in pairs],
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors='np',
+        )
+        inputs = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        logits = self.session.run(['logits'], inputs)[0]
+        return logits[:, 0].astype(np.float32)
+
+    def compute_score(
+        self,
+        sentence_pairs: Sequence[Sequence[str]],
+        batch_size: Optional[int] = None,
+        normalize: bool = False
+    ) -> List[float] | float:
+        # A single pair returns a float, like FlagReranker
+        single = len(sentence_pairs) == 2 and isinstance(sentence_pairs[0], str)
+        pairs = [tuple(sentence_pairs)] if single else [tuple(pair) for pair in sentence_pairs]
+        if not pairs:
+            return []
+
+        batch_size = batch_size or self.batch_size
+        order = np.argsort([len(query) + len(passage) for query, passage in pairs], kind='stable')
+        scores = np.empty(len(pairs), dtype=np.float32)
+        for start in range(0, len(pairs), batch_size):
+            batch_indices = order[start:start + batch_size]
+            scores[batch_indices] = self._score_batch([pairs[i] for i in batch_indices])
+
+        if normalize:
+            scores = 1 / (1 + np.exp(-scores))
+        return float(scores[0]) if single else scores.tolist()
@@ -1,6 +1,12 @@
+import time
 import uuid
-from qdrant_client import models, QdrantClient
-from typing import Literal, List, Dict, Any, Optional
+import asyncio
+import hashlib
+import functools
+import httpx
+from functools import lru_cache
+from qdrant_client import models, AsyncQdrantClient
+from typing import Literal, List, Dict, Any, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from fastembed.text import TextEmbedding
@@ -10,17 +16,111 @@ from fastembed.late_interaction import LateInteractionTextEmbedding
 from src.utils.config import settings
 from src.utils.logger.custom_logging import LoggerMixin
 from src.helpers.text_preprocess_helper import embedding_function, text_embedding_model, late_interaction_text_embedding_model, bm25_embedding_model
+from src.helpers.text_preprocess_helper import (
+    LATE_INTERACTION_DATATYPE,
+    LATE_INTERACTION_QUANTIZATION,
+    LATE_INTERACTION_RESCORE_ONLY,
+    pool_token_vectors,
+)
+from src.helpers.query_embedding_helper import QueryEncoder, QueryVectors, query_encoder
+from src.helpers.candidate_helper import CANDIDATE_PAYLOAD_FIELDS, Candidate
+from src.helpers.collection_cache_helper import CollectionMetadata, CollectionMetadataCache, collection_metadata_cache
+from src.helpers.semantic_cache_helper import SemanticRetrievalCache, semantic_retrieval_cache
+from src.schemas.filter import MetadataFilter
+from src.helpers.retrieval_config_helper import (
+    ExpansionMode,
+    FusionConfig,
+    FusionMode,
+    estimate_tokens,
+    get_expansion_config,
+    get_fusion_config,
+    is_shared_collection,
+)
 
 
 TEXT_EMBEDDING_MODEL="sentence-transformers/all-MiniLM-L6-v2"
 LATE_INTERACTION_TEXT_EMBEDDING_MODEL="colbert-ir/colbertv2.0"
 BM25_EMBEDDING_MODEL="Qdrant/bm25"
 
+# Indexing threshold (KB) of every collection. bulk_add_data sets it to 0 while loading and
+# restores this value when a load finds it already at 0 (left by another process or a crashed load)
+INDEXING_THRESHOLD = 20000
+
+# Namespace of the deterministic chunk point IDs
+CHUNK_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "chatbot-rag/chunks")
+
+# Payload indexes of every collection, built once by _create_collection and added to older
+# collections by `python -m src.scripts.qdrant_migrations payload-indexes`. Keyword indexes
+# back the section expansion and delete filters, metadata.index only needs range for order_by,
+# and organization_id is a tenant index so Qdrant keeps the points of each organization together.
+# extension and created_at back the MetadataFilter of the search.
+PAYLOAD_INDEX_SCHEMA: Dict[str, models.PayloadSchemaParams] = {
+    "metadata.document_id": models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD),
+    "metadata.document_name": models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD),
+    "metadata.headers": models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD),
+    "metadata.index": models.IntegerIndexParams(type=models.IntegerIndexType.INTEGER, lookup=False, range=True),
+    "metadata.organization_id": models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True),
+    "metadata.extension": models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD),
+    "metadata.created_at": models.DatetimeIndexParams(type=models.DatetimeIndexType.DATETIME),
+}
+
+
+def tenant_collection_name(collection_name: str, organization_id: Optional[str] = None, allow_shared: bool = False) -> str:
+    # Read paths pass allow_shared, so a shared knowledge base (SHARED_COLLECTIONS) keeps its name
+    if allow_shared and is_shared_collection(collection_name):
+        return collection_name
+    # In shared tenancy mode organizations are separated by the tenant index, not by collection
+    if organization_id and settings.QDRANT_TENANCY_MODE == 'per_collection':
+        return f"{collection_name}_{organization_id}"
+    return collection_name
+
+
+def create_async_qdrant_client(mode: Optional[str] = None, path: Optional[str] = None) -> AsyncQdrantClient:
+    # Embedded mode runs Qdrant inside the process: no server, HNSW config and payload indexes are ignored
+    mode = mode or settings.QDRANT_MODE
+    if mode == 'memory':
+        return AsyncQdrantClient(location=':memory:')
+    if mode == 'local':
+        return AsyncQdrantClient(path=path or settings.QDRANT_PATH)
+    return AsyncQdrantClient(
+        url=settings.QDRANT_ENDPOINT,
+        timeout=settings.QDRANT_TIMEOUT,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        limits=httpx.Limits(
+            max_connections=settings.QDRANT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.QDRANT_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+# One client (and therefore one connection pool) per process, shared by every QdrantConnection
+@lru_cache()
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    return create_async_qdrant_client()
+
+
 class QdrantConnection(LoggerMixin):
-    def __init__(self, embedding_func: HuggingFaceEmbeddings | None = embedding_function):
+    # Bulk loads running per collection and the indexing threshold to restore when the last
+    # one ends, shared by every connection of the process so concurrent loads of a collection
+    # do not save each other's 0 as the threshold
+    _bulk_loads: Dict[str, int] = {}
+    _indexing_thresholds: Dict[str, int] = {}
+    _bulk_loads_lock = asyncio.Lock()
+
+    def __init__(
+        self,
+        embedding_func: HuggingFaceEmbeddings | None = embedding_function,
+        client: Optional[AsyncQdrantClient] = None,
+        encoder: Optional[QueryEncoder] = None,
+        metadata_cache: Optional[CollectionMetadataCache] = None,
+        retrieval_cache: Optional[SemanticRetrievalCache] = None
+    ):
         super().__init__()
-        self.client = QdrantClient(url=settings.QDRANT_ENDPOINT, timeout=600)
+        self.client = client or get_async_qdrant_client()
         self.embedding_function = embedding_func
+        self.query_encoder = encoder or query_encoder
+        self.metadata_cache = metadata_cache or collection_metadata_cache
+        self.retrieval_cache = retrieval_cache or semantic_retrieval_cache
 
         self.text_embedding_model = text_embedding_model
         self.late_interaction_text_embedding_model = late_interaction_text_embedding_model
@@ -30,225 +130,849 @@ class QdrantConnection(LoggerMixin):
         self, 
         documents: List[Document], 
         collection_name: str = settings.QDRANT_COLLECTION_NAME,
-        organization_id: Optional[str] = None
+        organization_id: Optional[str] = None,
+        upsert: bool = False
     ) -> bool:
-        if not self.client.collection_exists(collection_name=collection_name):
+        if not await self.collection_exists(collection_name):
             self.logger.info(f"CREATING NEW COLLECTION {collection_name}")
-            is_created = self._create_collection(collection_name=collection_name)
+            is_created = await self._create_collection(collection_name=collection_name)
             if is_created:
                 self.logger.info(f"CREATING NEW COLLECTION {collection_name} SUCCESS.")
 
         # Upload documents with organization_id
-        self._upload_documents(
-            collection_name=collection_name, 
-            documents=documents, 
-            batch_size=16,
-            organization_id=organization_id
-        )
-
-        self.logger.info(f"CREATING PAYLOAD INDEX {collection_name}")
-        self.client.create_payload_index(
-            collection_name=collection_name,
-            field_name="metadata.index",
-            field_schema="integer",
-        )
-        
-        # Tạo index cho organization_id để hỗ trợ tìm kiếm hiệu quả
-        if organization_id:
-            self.client.create_payload_index(
+        if upsert:
+            await self._upsert_documents(
                 collection_name=collection_name,
-                field_name="metadata.organization_id",
-                field_schema="keyword",
+                documents=documents,
+                batch_size=16,
+                organization_id=organization_id
             )
-            
+        else:
+            await self._upload_documents(
+                collection_name=collection_name, 
+                documents=documents, 
+                batch_size=16,
+                organization_id=organization_id
+            )
+
+        self._invalidate_collection(collection_name)
         return True
 
+    def _invalidate_collection(self, collection_name: str) -> None:
+        # Every write to a collection drops what was cached about it
+        self.metadata_cache.invalidate(collection_name)
+        self.retrieval_cache.invalidate(collection_name)
+
+    async def get_collection_metadata(self, collection_name: str) -> CollectionMetadata:
+        return await self.metadata_cache.get(self.client, collection_name)
+
+    async def collection_exists(self, collection_name: str) -> bool:
+        return (await self.get_collection_metadata(collection_name)).exists
+
     async def hybrid_search(
         self, 
         query: str = None,
-        collection_name: str = settings.QDRANT_COLLECTION_NAME,
-        organization_id: Optional[str] = None
-    ) -> Optional[List[Document]]:
-        if not self.client.collection_exists(collection_name=collection_name):
-            raise Exception(f"Collection {collection_name} does not exist")
+        collection_name: str | List[str] = settings.QDRANT_COLLECTION_NAME,
+        organization_id: Optional[str] = None,
+        fusion: Optional[FusionMode] = None,
+        dense_prefetch_limit: Optional[int] = None,
+        sparse_prefetch_limit: Optional[int] = None,
+        top_k: Optional[int] = None,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> Optional[List[Candidate]]:
+        collection_names = [collection_name] if isinstance(collection_name, str) else list(dict.fromkeys(collection_name))
+        existing_collections = [
+            name for name, exists in zip(
+                collection_names,
+                await asyncio.gather(*[self.collection_exists(name) for name in collection_names])
+            )
+            if exists
+        ]
+        # A federated search still answers from the collections that exist
+        if not existing_collections or (len(collection_names) == 1 and collection_names != existing_collections):
+            raise Exception(f"Collection {', '.join(collection_names)} does not exist")
+        if len(existing_collections) < len(collection_names):
+            self.logger.warning(f"Skipping missing collections {set(collection_names) - set(existing_collections)}")
 
-        dense_query_vector = next(self.text_embedding_model.query_embed(query))
-        sparse_query_vector = next(self.bm25_embedding_model.query_embed(query))
-        late_query_vector = next(self.late_interaction_text_embedding_model.query_embed(query))
+        # Fusion mode and prefetch sizes of each collection, overridden by the request
+        fusion_configs = {
+            name: get_fusion_config(name, fusion, dense_prefetch_limit, sparse_prefetch_limit, top_k)
+            for name in existing_collections
+        }
+        # Only the query encoders the fusion modes need are run
+        query_fields = list(dict.fromkeys(
+            field for fusion_config in fusion_configs.values() for field in fusion_config.query_fields
+        ))
+        query_vectors = await self.query_encoder.aencode(query, query_fields)
 
-        # Thêm filter dựa trên organization_id nếu có
-        organization_filter = None
-        if organization_id:
-            organization_filter = models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="metadata.organization_id",
-                        match=models.MatchValue(value=organization_id),
-                    )
-                ]
+        # Collections are searched concurrently, so latency follows the slowest one.
+        # Thêm filter dựa trên organization_id và metadata nếu có (shared collections have no organization)
+        collections_points = await asyncio.gather(*[
+            self._search_collection(
+                name,
+                query_vectors,
+                fusion_configs[name],
+                self._create_search_filter(self._collection_organization(name, organization_id), metadata_filter)
             )
+            for name in existing_collections
+        ])
+        if len(existing_collections) == 1:
+            return [self._point_to_candidate(point, existing_collections[0]) for point in collections_points[0]]
+        return self._fuse_collections_points(
+            dict(zip(existing_collections, collections_points)),
+            limit=max(fusion_config.limit for fusion_config in fusion_configs.values())
+        )
 
-        prefetch = self._create_prefetch(dense_query_vector, sparse_query_vector, organization_filter)
-
-        results = self.client.query_points(
+    async def _search_collection(
+        self,
+        collection_name: str,
+        query_vectors: QueryVectors,
+        fusion_config: FusionConfig,
+        query_filter: Optional[models.Filter] = None
+    ) -> List[models.ScoredPoint]:
+        results = await self.client.query_points(
             collection_name,
-            prefetch=prefetch,
-            query=late_query_vector,
-            using=LATE_INTERACTION_TEXT_EMBEDDING_MODEL,
-            with_payload=True,
-            filter=organization_filter,  # Áp dụng filter khi truy vấn
-            limit=20,
+            **self._create_fusion_query(query_vectors, fusion_config, query_filter),
+            with_payload=CANDIDATE_PAYLOAD_FIELDS,
+            query_filter=query_filter,  # Áp dụng filter khi truy vấn
+            limit=fusion_config.limit,
+        )
+        return results.points
+
+    def _create_fusion_query(
+        self,
+        query_vectors: QueryVectors,
+        fusion_config: FusionConfig,
+        query_filter: Optional[models.Filter] = None
+    ) -> Dict[str, Any]:
+        # prefetch / query / using of a query_points call or a QueryRequest
+        if fusion_config.fusion == 'dense_only':
+            return {'query': query_vectors.dense.tolist(), 'using': TEXT_EMBEDDING_MODEL}
+
+        prefetch = self._create_prefetch(
+            query_vectors.dense,
+            query_vectors.sparse,
+            query_filter,
+            fusion_config.dense_prefetch_limit,
+            fusion_config.sparse_prefetch_limit
         )
-        return [self._point_to_document(point) for point in results.points]
+        if fusion_config.fusion == 'rrf':
+            return {'prefetch': prefetch, 'query': models.FusionQuery(fusion=models.Fusion.RRF)}
+        if fusion_config.fusion == 'dbsf':
+            return {'prefetch': prefetch, 'query': models.FusionQuery(fusion=models.Fusion.DBSF)}
+        return {
+            'prefetch': prefetch,
+            'query': query_vectors.late_interaction.tolist(),
+            'using': LATE_INTERACTION_TEXT_EMBEDDING_MODEL,
+        }
+
+    def _fuse_collections_points(
+        self,
+        collections_points: Dict[str, List[models.ScoredPoint]],
+        limit: int = 20
+    ) -> List[Candidate]:
+        # Scores are not comparable across collections, so min-max normalize each one before merging
+        fused = []
+        for collection_name, points in collections_points.items():
+            if not points:
+                continue
+            scores = [point.score for point in points]
+            low, high = min(scores), max(scores)
+            for point in points:
+                normalized_score = (point.score - low) / (high - low) if high > low else 1.0
+                fused.append(self._point_to_candidate(point, collection_name)._replace(score=normalized_score))
+
+        fused.sort(key=lambda candidate: candidate.score, reverse=True)
+        return fused[:limit]
+
+    async def hybrid_search_batch(
+        self,
+        queries: List[str],
+        collection_name: str = settings.QDRANT_COLLECTION_NAME,
+        organization_id: Optional[str] = None
+    ) -> List[List[Candidate]]:
+        if not queries:
+            return []
+        if not await self.collection_exists(collection_name):
+            raise Exception(f"Collection {collection_name} does not exist")
+
+        fusion_config = get_fusion_config(collection_name)
+        queries_vectors = await self.query_encoder.aencode_batch(queries, fusion_config.query_fields)
+        organization_filter = self._create_organization_filter(self._collection_organization(collection_name, organization_id))
+
+        # Every query is searched with the fusion mode of the collection in a single request
+        requests = [
+            models.QueryRequest(
+                **self._create_fusion_query(query_vectors, fusion_config, organization_filter),
+                filter=organization_filter,
+                with_payload=CANDIDATE_PAYLOAD_FIELDS,
+                limit=fusion_config.limit,
+            )
+            for query_vectors in queries_vectors
+        ]
+        batch_results = await self.client.query_batch_points(collection_name, requests=requests)
+        return [
+            [self._point_to_candidate(point, collection_name) for point in results.points]
+            for results in batch_results
+        ]
     
 
     async def query_headers(
         self, 
-        documents: List[Document], 
+        candidates: List[Candidate], 
         collection_name: str = settings.QDRANT_COLLECTION_NAME,
-        organization_id: Optional[str] = None
-    ) -> Optional[List[Document]]:
-        processed_documents = {}
-        # get max point data in qdrant collection 
-        info_collection = self.client.get_collection(collection_name=collection_name)
-        vectors_count = int(info_collection.points_count)
-        for doc in documents:
-            if doc.metadata['headers'] in processed_documents:
-                processed_documents[doc.metadata['headers']]['score'] += 1
-                continue
+        organization_id: Optional[str] = None,
+        max_sections: Optional[int] = None,
+        expansion: Optional[ExpansionMode] = None,
+        window: Optional[int] = None,
+        token_budget: Optional[int] = None
+    ) -> Optional[List[Candidate]]:
+        # Count hits per section, keeping the rerank order of first appearance for ties.
+        # Candidates from a federated search carry the collection they were found in.
+        sections: Dict[tuple, Dict[str, Any]] = {}
+        for candidate in candidates:
+            section_key = (
+                candidate.collection_name or collection_name,
+                candidate.document_name,
+                candidate.headers
+            )
+            if section_key not in sections:
+                sections[section_key] = {'hit': candidate, 'score': 0, 'hit_indexes': []}
+            sections[section_key]['score'] += 1
+            if candidate.index is not None:
+                sections[section_key]['hit_indexes'].append(candidate.index)
 
-            # Thêm filter dựa trên organization_id
-            query_filter = self._create_headers_filter(doc.metadata, organization_id)
-            
-            results = self.client.query_points(
+        if not sections:
+            return []
+        if max_sections is not None:
+            # Only the sections that can make the result are expanded
+            sections = dict(sorted(sections.items(), key=lambda item: item[1]['score'], reverse=True)[:max_sections])
+
+        collections_sections: Dict[str, List[tuple]] = {}
+        for section_key in sections:
+            collections_sections.setdefault(section_key[0], []).append(section_key[1:])
+
+        # Each collection expands whole sections, or windows of neighbours around the hits
+        expansion_configs = {
+            name: get_expansion_config(name, expansion, window, token_budget)
+            for name in collections_sections
+        }
+        collections_windows = {
+            name: {
+                section: self._merge_windows(sections[(name, *section)]['hit_indexes'], expansion_configs[name].window)
+                for section in collection_sections
+            } if expansion_configs[name].mode == 'window' else None
+            for name, collection_sections in collections_sections.items()
+        }
+
+        section_contents: Dict[tuple, str] = {}
+        for name, contents in zip(
+            collections_sections,
+            await asyncio.gather(*[
+                self._fetch_sections(
+                    name, collection_sections, self._collection_organization(name, organization_id), collections_windows[name]
+                )
+                for name, collection_sections in collections_sections.items()
+            ])
+        ):
+            for section, chunks in contents.items():
+                section_key = (name, *section)
+                if collections_windows[name] is None:
+                    section_contents[section_key] = ''.join(content for _, content in chunks)
+                    continue
+                section_contents[section_key] = self._join_windows(self._trim_to_budget(
+                    chunks, sections[section_key]['hit_indexes'], expansion_configs[name].token_budget
+                ))
+
+        # One candidate per section, scored by its number of hits
+        section_candidates = [
+            section['hit']._replace(
+                id=None,
+                score=section['score'],
+                page_content=section_contents.get(section_key, ''),
+                index=None,
+                collection_name=section_key[0]
+            )
+            for section_key, section in sections.items()
+        ]
+
+        # Sort the sections based on the 'score' in descending order
+        return sorted(section_candidates, key=lambda candidate: candidate.score, reverse=True)
+
+    async def _fetch_sections(
+        self,
+        collection_name: str,
+        sections: List[tuple],
+        organization_id: Optional[str] = None,
+        windows: Optional[Dict[tuple, List[Tuple[int, int]]]] = None
+    ) -> Dict[tuple, List[Tuple[int, str]]]:
+        # Fetch every chunk of every section (or of its windows) in one query, sized to the
+        # sections instead of the collection. Returns (metadata.index, page_content) pairs.
+        query_filter = self._create_sections_filter(sections, organization_id, windows)
+        chunks_count = (await self.client.count(
+            collection_name=collection_name,
+            count_filter=query_filter,
+            exact=True,
+        )).count
+
+        section_contents: Dict[tuple, List[Tuple[int, str]]] = {section: [] for section in sections}
+        if chunks_count > 0:
+            results = await self.client.query_points(
                 collection_name,
-                prefetch=[
-                    models.Prefetch(
-                        filter=query_filter,
-                        limit=vectors_count,
-                    ),
-                ],
                 query=models.OrderByQuery(order_by="metadata.index"),
-                limit=vectors_count,
+                query_filter=query_filter,
+                with_payload=["page_content", "metadata.document_name", "metadata.headers", "metadata.index"],
+                limit=chunks_count,
             )
-            
-            page_content = ''.join([point.payload['page_content'] for point in results.points])
-            metadata = {
-                'document_name': doc.metadata['document_name'],
-                'headers': doc.metadata['headers'],
-                'document_id': doc.metadata['document_id'],
-            }
-            
-            # Thêm organization_id vào metadata nếu có
-            if organization_id:
-                metadata['organization_id'] = organization_id
-
-            processed_documents[doc.metadata['headers']] = {
-                'document': Document(page_content=page_content, metadata=metadata),
-                'score': 1
-            }
-
-        # Sort the documents based on the 'score' in descending order
-        documents_with_scores = processed_documents.items()
-        sorted_documents = sorted(documents_with_scores, key=lambda item: item[1]['score'], reverse=True)
-        sorted_documents_list = [item[1]['document'] for item in sorted_documents]
-        return sorted_documents_list 
+            # Points arrive ordered by metadata.index, so appending keeps each section in order
+            for point in results.points:
+                point_metadata = point.payload.get('metadata', {})
+                section = (point_metadata.get('document_name'), point_metadata.get('headers'))
+                if section in section_contents:
+                    section_contents[section].append((point_metadata.get('index'), point.payload['page_content']))
+        return section_contents
+
+    @staticmethod
+    def _merge_windows(hit_indexes: List[int], window: int) -> List[Tuple[int, int]]:
+        # [index - window, index + window] around each hit, overlapping or touching windows merged
+        merged: List[Tuple[int, int]] = []
+        for index in sorted(set(hit_indexes)):
+            start, end = index - window, index + window
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _trim_to_budget(chunks: List[Tuple[int, str]], hit_indexes: List[int], token_budget: int) -> List[Tuple[int, str]]:
+        # Hits are always kept, then their neighbours from the closest outwards while the budget allows
+        if not hit_indexes:
+            return chunks
+        hits = set(hit_indexes)
+        kept, tokens = [], 0
+        for index, content in sorted(chunks, key=lambda chunk: (min(abs(chunk[0] - hit) for hit in hits), chunk[0])):
+            chunk_tokens = estimate_tokens(content)
+            if index not in hits and tokens + chunk_tokens > token_budget:
+                continue
+            kept.append((index, content))
+            tokens += chunk_tokens
+        return sorted(kept)
+
+    @staticmethod
+    def _join_windows(chunks: List[Tuple[int, str]]) -> str:
+        # Consecutive chunks are joined like a whole section, gaps between windows become a blank line
+        windows: List[List[str]] = []
+        previous_index = None
+        for index, content in chunks:
+            if previous_index is None or index != previous_index + 1:
+                windows.append([])
+            windows[-1].append(content)
+            previous_index = index
+        return '\n\n'.join(''.join(window) for window in windows)
     
-    def _create_collection(self, collection_name: str) -> bool:
+    async def _create_collection(self, collection_name: str) -> bool:
         config = self._get_collection_config(
             text_embedding_model=TEXT_EMBEDDING_MODEL,
             late_interaction_text_embedding_model=LATE_INTERACTION_TEXT_EMBEDDING_MODEL, 
             bm25_embedding_model=BM25_EMBEDDING_MODEL
         )
-        return self.client.create_collection(collection_name=collection_name, **config)  
+        is_created = await self.client.create_collection(collection_name=collection_name, **config)
+        if is_created:
+            await self._create_payload_indexes(collection_name, list(PAYLOAD_INDEX_SCHEMA))
+        self._invalidate_collection(collection_name)
+        return is_created
+
+    async def _create_payload_indexes(self, collection_name: str, field_names: List[str]) -> None:
+        for field_name in field_names:
+            self.logger.info(f"CREATING PAYLOAD INDEX {field_name} ON {collection_name}")
+            await self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=PAYLOAD_INDEX_SCHEMA[field_name],
+                wait=True,
+            )
+
+    async def ensure_payload_indexes(self, collection_name: str) -> List[str]:
+        # Adds the indexes of PAYLOAD_INDEX_SCHEMA that the collection does not have yet
+        info = await self.client.get_collection(collection_name=collection_name)
+        missing_fields = [
+            field_name for field_name in PAYLOAD_INDEX_SCHEMA
+            if field_name not in (info.payload_schema or {})
+        ]
+        await self._create_payload_indexes(collection_name, missing_fields)
+        return missing_fields
+
+    async def delete_organization_points(self, collection_name: str, organization_id: str) -> None:
+        await self.client.delete(
+            collection_name=collection_name,
+            points_selector=self._create_organization_filter(organization_id),
+        )
+        self._invalidate_collection(collection_name)
+
+    async def fold_collection(
+        self,
+        source_collection_name: str,
+        target_collection_name: str,
+        organization_id: str,
+        batch_size: int = 256
+    ) -> int:
+        # Copies every point of a per-organization collection, vectors included, into a shared
+        # collection and tags it with the organization. Point IDs are kept, so it can be re-run.
+        if not await self.collection_exists(target_collection_name):
+            await self._create_collection(target_collection_name)
+
+        copied_points = 0
+        offset = None
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=source_collection_name,
+                with_payload=True,
+                with_vectors=True,
+                limit=batch_size,
+                offset=offset,
+            )
+            points = []
+            for record in records:
+                payload = dict(record.payload)
+                payload['metadata'] = {**payload.get('metadata', {}), 'organization_id': organization_id}
+                points.append(models.PointStruct(id=record.id, vector=record.vector, payload=payload))
+            if points:
+                await self.client.upsert(collection_name=target_collection_name, points=points)
+                copied_points += len(points)
+            if offset is None:
+                break
+
+        self._invalidate_collection(target_collection_name)
+        return copied_points
+
+    async def list_collection_names(self) -> List[str]:
+        return [collection.name for collection in (await self.client.get_collections()).collections]
     
-    def _delete_collection(self, collection_name: str) -> bool:
-        return self.client.delete_collection(collection_name=collection_name)
+    async def _delete_collection(self, collection_name: str) -> bool:
+        is_deleted = await self.client.delete_collection(collection_name=collection_name)
+        self._invalidate_collection(collection_name)
+        return is_deleted
         
-    def _upload_documents(
+    async def _upload_documents(
         self,
         collection_name: str,
         documents: List[Document],
         batch_size: int = 4,
-        organization_id: Optional[str] = None
+        organization_id: Optional[str] = None,
+        point_ids: Optional[List[str]] = None
     ) -> None:
+        if point_ids is None:
+            point_ids = self._chunk_point_ids(documents)
+
         for batch_start in range(0, len(documents), batch_size):
-            batch = documents[batch_start:batch_start + batch_size]
-            
-            # Extract page_content for embedding generation
-            texts = [doc.page_content for doc in batch]
-            dense_embeddings = list(self.text_embedding_model.passage_embed(texts))
-            bm25_embeddings = list(self.bm25_embedding_model.passage_embed(texts))
-            late_interaction_embeddings = list(self.late_interaction_text_embedding_model.passage_embed(texts))
+            points = self._build_points(
+                documents[batch_start:batch_start + batch_size],
+                point_ids[batch_start:batch_start + batch_size],
+                organization_id
+            )
+            # upload_points of the async client is synchronous and returns None, so it cannot be awaited
+            await self.client.upsert(collection_name, points=points)
+
+    def _point_metadata(self, doc: Document, organization_id: Optional[str] = None) -> Dict[str, Any]:
+        # Đảm bảo metadata là dictionary
+        metadata = doc.metadata.copy() if isinstance(doc.metadata, dict) else dict(doc.metadata)
+
+        # Thêm organization_id vào metadata nếu có
+        if organization_id:
+            metadata['organization_id'] = organization_id
+        metadata['content_hash'] = self._content_hash(doc.page_content)
+        return metadata
+
+    def _build_points(
+        self,
+        documents: List[Document],
+        point_ids: List[str],
+        organization_id: Optional[str] = None
+    ) -> List[models.PointStruct]:
+        # Extract page_content for embedding generation
+        texts = [doc.page_content for doc in documents]
+        dense_embeddings = list(self.text_embedding_model.passage_embed(texts))
+        bm25_embeddings = list(self.bm25_embedding_model.passage_embed(texts))
+        late_interaction_embeddings = list(self.late_interaction_text_embedding_model.passage_embed(texts))
+        
+        # Tạo points với organization_id trong metadata
+        points = []
+        for i, doc in enumerate(documents):
+            metadata = self._point_metadata(doc, organization_id)
             
-            # Tạo points với organization_id trong metadata
-            points = []
-            for i, doc in enumerate(batch):
-                # Đảm bảo metadata là dictionary
-                metadata = doc.metadata.copy() if isinstance(doc.metadata, dict) else dict(doc.metadata)
-                
-                # Thêm organization_id vào metadata nếu có
-                if organization_id:
-                    metadata['organization_id'] = organization_id
-                
-                points.append(
-                    models.PointStruct(
-                        id = str(uuid.uuid4()),
-                        vector={
-                            TEXT_EMBEDDING_MODEL: dense_embeddings[i].tolist(),
-                            LATE_INTERACTION_TEXT_EMBEDDING_MODEL: late_interaction_embeddings[i].tolist(),
-                            BM25_EMBEDDING_MODEL: bm25_embeddings[i].as_object(),
-                        },
-                        payload={
-                            "page_content": doc.page_content,
-                            "metadata": metadata
-                        }
+            points.append(
+                models.PointStruct(
+                    id = point_ids[i],
+                    vector={
+                        TEXT_EMBEDDING_MODEL: dense_embeddings[i].tolist(),
+                        LATE_INTERACTION_TEXT_EMBEDDING_MODEL: pool_token_vectors(late_interaction_embeddings[i]).tolist(),
+                        BM25_EMBEDDING_MODEL: bm25_embeddings[i].as_object(),
+                    },
+                    payload={
+                        "page_content": doc.page_content,
+                        "metadata": metadata
+                    }
+                )
+            )
+        return points
+
+    async def bulk_add_data(
+        self,
+        documents: List[Document],
+        collection_name: str = settings.QDRANT_COLLECTION_NAME,
+        organization_id: Optional[str] = None,
+        batch_size: int = 64,
+        parallel: int = 4,
+        wait_indexed: bool = True,
+        index_timeout: float = settings.QDRANT_TIMEOUT
+    ) -> Dict[str, Any]:
+        if not await self.collection_exists(collection_name):
+            await self._create_collection(collection_name=collection_name)
+
+        # Point IDs derive from the chunk content, so the chunks of an earlier version of a file
+        # that are not in this load would stay next to the new ones: they are deleted first
+        point_ids = self._chunk_point_ids(documents)
+        stored_metadata = await self._get_chunk_metadata(
+            collection_name, self._document_names(documents), organization_id
+        )
+        stale_point_ids = list(set(stored_metadata) - set(point_ids))
+        if stale_point_ids:
+            await self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=stale_point_ids),
+            )
+
+        # Segments are not indexed while loading, so Qdrant does not rebuild the HNSW graphs
+        # and the INT8 quantized vectors every time a segment is flushed. A collection read by
+        # other organizations keeps indexing, their searches would fall back to full scans.
+        defer_indexing = settings.QDRANT_TENANCY_MODE != 'shared' and not is_shared_collection(collection_name)
+        if defer_indexing:
+            await self._begin_bulk_load(collection_name)
+
+        started_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        upload_slots = asyncio.Semaphore(parallel)
+        uploads = []
+
+        async def upload(points: List[models.PointStruct]) -> None:
+            try:
+                await self.client.upsert(collection_name=collection_name, points=points, wait=False)
+            finally:
+                upload_slots.release()
+
+        try:
+            batch_starts = list(range(0, len(documents), batch_size))
+            for batch_start in batch_starts:
+                # The next batch is embedded while up to `parallel` uploads are in flight
+                points = await loop.run_in_executor(
+                    None,
+                    self._build_points,
+                    documents[batch_start:batch_start + batch_size],
+                    point_ids[batch_start:batch_start + batch_size],
+                    organization_id
+                )
+                if batch_start == batch_starts[-1]:
+                    # The last batch waits until it is applied, which happens after every batch
+                    # already acknowledged, so the collection holds all the points afterwards
+                    await asyncio.gather(*uploads)
+                    await self.client.upsert(collection_name=collection_name, points=points, wait=True)
+                    break
+                await upload_slots.acquire()
+                uploads.append(asyncio.create_task(upload(points)))
+        finally:
+            await asyncio.gather(*uploads, return_exceptions=True)
+            upload_seconds = time.perf_counter() - started_at
+            if defer_indexing:
+                await self._end_bulk_load(collection_name)
+            self._invalidate_collection(collection_name)
+
+        is_green = await self._wait_collection_green(collection_name, timeout=index_timeout) if wait_indexed else None
+        total_seconds = time.perf_counter() - started_at
+        stats = {
+            'points': len(documents),
+            'deleted': len(stale_point_ids),
+            'upload_seconds': round(upload_seconds, 3),
+            'indexing_seconds': round(total_seconds - upload_seconds, 3),
+            'points_per_second': round(len(documents) / total_seconds, 1) if total_seconds else 0.0,
+            'green': is_green,
+        }
+        self.logger.info(f'event=bulk-add-data message="Bulk loaded {collection_name}" stats={stats}')
+        return stats
+
+    async def _begin_bulk_load(self, collection_name: str) -> None:
+        async with self._bulk_loads_lock:
+            if self._bulk_loads.get(collection_name, 0) == 0:
+                info = await self.client.get_collection(collection_name=collection_name)
+                indexing_threshold = info.config.optimizer_config.indexing_threshold
+                # 0 means another process is loading or a load crashed before restoring it
+                self._indexing_thresholds[collection_name] = indexing_threshold or INDEXING_THRESHOLD
+                await self.client.update_collection(
+                    collection_name=collection_name,
+                    optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+                )
+            self._bulk_loads[collection_name] = self._bulk_loads.get(collection_name, 0) + 1
+
+    async def _end_bulk_load(self, collection_name: str) -> None:
+        async with self._bulk_loads_lock:
+            self._bulk_loads[collection_name] -= 1
+            if self._bulk_loads[collection_name] > 0:
+                return
+            del self._bulk_loads[collection_name]
+            # Restoring the threshold makes the optimizer index the loaded segments
+            await self.client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=models.OptimizersConfigDiff(
+                    indexing_threshold=self._indexing_thresholds.pop(collection_name)
+                ),
+            )
+
+    async def _wait_collection_green(
+        self,
+        collection_name: str,
+        timeout: float = settings.QDRANT_TIMEOUT,
+        poll_interval: float = 1.0
+    ) -> bool:
+        # The optimizer may not have picked up the restored threshold at the first poll, so the
+        # collection counts as indexed once it is GREEN with the same indexed_vectors_count twice
+        deadline = time.monotonic() + timeout
+        green_indexed_vectors = None
+        while time.monotonic() < deadline:
+            info = await self.client.get_collection(collection_name=collection_name)
+            if info.status != models.CollectionStatus.GREEN:
+                green_indexed_vectors = None
+            elif green_indexed_vectors == info.indexed_vectors_count:
+                return True
+            else:
+                green_indexed_vectors = info.indexed_vectors_count
+            await asyncio.sleep(poll_interval)
+        return False
+
+    async def _upsert_documents(
+        self,
+        collection_name: str,
+        documents: List[Document],
+        batch_size: int = 4,
+        organization_id: Optional[str] = None
+    ) -> Dict[str, int]:
+        # Only chunks that are not stored yet are embedded and uploaded. Kept chunks keep their
+        # vectors and their ingestion date but get their whole metadata rewritten when it
+        # changed (index, headers, extension, ...), chunks that disappeared are deleted.
+        point_ids = self._chunk_point_ids(documents)
+        # Stored chunks are matched by file name, so points written under an older document_id
+        # scheme (random uuid4) are replaced instead of duplicated on the first re-upload
+        stored_metadata = await self._get_chunk_metadata(
+            collection_name, self._document_names(documents), organization_id
+        )
+
+        new_documents, new_point_ids, metadata_updates = [], [], []
+        for point_id, doc in zip(point_ids, documents):
+            if point_id not in stored_metadata:
+                new_documents.append(doc)
+                new_point_ids.append(point_id)
+                continue
+            metadata = self._point_metadata(doc, organization_id)
+            # Every ingest stamps a new created_at, an untouched chunk keeps the stored one
+            if 'created_at' in stored_metadata[point_id]:
+                metadata['created_at'] = stored_metadata[point_id]['created_at']
+            if stored_metadata[point_id] != metadata:
+                metadata_updates.append(
+                    models.SetPayloadOperation(
+                        set_payload=models.SetPayload(
+                            payload={'metadata': metadata},
+                            points=[point_id],
+                        )
                     )
                 )
-            
-            self.client.upload_points(
-                collection_name,
-                points=points,
+        stale_point_ids = list(set(stored_metadata) - set(point_ids))
+
+        if new_documents:
+            await self._upload_documents(
+                collection_name=collection_name,
+                documents=new_documents,
                 batch_size=batch_size,
+                organization_id=organization_id,
+                point_ids=new_point_ids
+            )
+        if metadata_updates:
+            await self.client.batch_update_points(collection_name, update_operations=metadata_updates)
+        if stale_point_ids:
+            await self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=stale_point_ids),
+            )
+
+        stats = {
+            'inserted': len(new_documents),
+            'updated': len(metadata_updates),
+            'deleted': len(stale_point_ids),
+            'unchanged': len(documents) - len(new_documents) - len(metadata_updates),
+        }
+        self.logger.info(f'event=upsert-documents message="Upserted documents into {collection_name}" stats={stats}')
+        return stats
+
+    @staticmethod
+    def _document_names(documents: List[Document]) -> List[str]:
+        return list(dict.fromkeys(
+            str(doc.metadata['document_name']) for doc in documents if doc.metadata.get('document_name')
+        ))
+
+    async def _get_chunk_metadata(
+        self,
+        collection_name: str,
+        document_names: List[str],
+        organization_id: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        # point id -> metadata of every stored chunk of the documents
+        if not document_names:
+            return {}
+        conditions = [
+            models.FieldCondition(
+                key="metadata.document_name",
+                match=models.MatchAny(any=document_names),
+            )
+        ]
+        if organization_id:
+            conditions.append(
+                models.FieldCondition(
+                    key="metadata.organization_id",
+                    match=models.MatchValue(value=organization_id),
+                )
+            )
+
+        chunk_metadata = {}
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=models.Filter(must=conditions),
+                with_payload=["metadata"],
+                with_vectors=False,
+                limit=1000,
+                offset=offset,
             )
+            for point in points:
+                chunk_metadata[str(point.id)] = point.payload.get('metadata', {})
+            if offset is None:
+                return chunk_metadata
 
-    def _point_to_document(self, point: models.ScoredPoint) -> Document:
-        return Document(page_content=point.payload['page_content'], metadata=point.payload['metadata'])
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _chunk_point_ids(self, documents: List[Document]) -> List[str]:
+        # The ID of a chunk is derived from its document and its content, so re-ingesting an
+        # unchanged chunk lands on the same point. Identical chunks of one document are told
+        # apart by their occurrence number rather than their position, so inserting a chunk
+        # does not shift the IDs of every chunk after it.
+        occurrences: Dict[tuple, int] = {}
+        point_ids = []
+        for doc in documents:
+            key = (
+                str(doc.metadata.get('document_id') or doc.metadata.get('document_name')),
+                self._content_hash(doc.page_content)
+            )
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            point_ids.append(str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{key[0]}:{key[1]}:{occurrence}")))
+        return point_ids
+
+    def _point_to_candidate(self, point: models.ScoredPoint, collection_name: Optional[str] = None) -> Candidate:
+        return Candidate.from_payload(point.id, point.score, point.payload, collection_name)
 
     def _create_prefetch(
         self, 
         dense_query_vector,
         sparse_query_vector, 
-        query_filter: Optional[models.Filter] = None
+        query_filter: Optional[models.Filter] = None,
+        dense_limit: int = 40,
+        sparse_limit: int = 40
     ) -> List[models.Prefetch]:
         return [
             models.Prefetch(
                 query=dense_query_vector,
                 using=TEXT_EMBEDDING_MODEL,
                 filter=query_filter,
-                limit=40,   
+                limit=dense_limit,   
             ),
             models.Prefetch(
                 query=models.SparseVector(**sparse_query_vector.as_object()),
                 using=BM25_EMBEDDING_MODEL,
                 filter=query_filter,
-                limit=40,
+                limit=sparse_limit,
             ),
         ]
     
-    def _create_headers_filter(self, metadata: dict, organization_id: Optional[str] = None) -> models.Filter:
-        conditions = [
-            models.FieldCondition(key="metadata.document_name", match=models.MatchValue(value=metadata['document_name'])),
-            models.FieldCondition(key="metadata.headers", match=models.MatchValue(value=metadata['headers']))
-        ]
-        
+    def _create_organization_filter(self, organization_id: Optional[str] = None) -> Optional[models.Filter]:
+        if not organization_id:
+            return None
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="metadata.organization_id",
+                    match=models.MatchValue(value=organization_id),
+                )
+            ]
+        )
+
+    @staticmethod
+    def _collection_organization(collection_name: str, organization_id: Optional[str]) -> Optional[str]:
+        # Points of a shared knowledge base carry no organization_id, so they are not filtered by it
+        return None if is_shared_collection(collection_name) else organization_id
+
+    def _create_search_filter(
+        self,
+        organization_id: Optional[str] = None,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> Optional[models.Filter]:
+        # Goes into both prefetches, so the ANN search only walks the matching points
+        organization_filter = self._create_organization_filter(organization_id)
+        conditions = list(organization_filter.must) if organization_filter else []
+        if metadata_filter is not None:
+            for key, values in (
+                ("metadata.document_id", metadata_filter.document_ids),
+                ("metadata.document_name", metadata_filter.document_names),
+                ("metadata.extension", [value.lower().lstrip('.') for value in metadata_filter.extensions or []]),
+            ):
+                if values:
+                    conditions.append(models.FieldCondition(key=key, match=models.MatchAny(any=values)))
+            created_at = metadata_filter.created_at
+            if created_at is not None and (created_at.gte or created_at.lte):
+                conditions.append(models.FieldCondition(
+                    key="metadata.created_at",
+                    range=models.DatetimeRange(gte=created_at.gte, lte=created_at.lte)
+                ))
+        return models.Filter(must=conditions) if conditions else None
+
+    def _create_sections_filter(
+        self,
+        sections: List[tuple],
+        organization_id: Optional[str] = None,
+        windows: Optional[Dict[tuple, List[Tuple[int, int]]]] = None
+    ) -> models.Filter:
+        # One nested filter per (document_name, headers) pair, any of which may match.
+        # With windows, only the metadata.index ranges of the section are matched.
+        section_conditions = []
+        for document_name, headers in sections:
+            must = [
+                models.FieldCondition(key="metadata.document_name", match=models.MatchValue(value=document_name)),
+                models.FieldCondition(key="metadata.headers", match=models.MatchValue(value=headers))
+            ]
+            if windows is not None and windows.get((document_name, headers)):
+                must.append(models.Filter(should=[
+                    models.FieldCondition(key="metadata.index", range=models.Range(gte=start, lte=end))
+                    for start, end in windows[(document_name, headers)]
+                ]))
+            section_conditions.append(models.Filter(must=must))
+
         # Thêm filter cho organization_id nếu có
+        conditions = []
         if organization_id:
             conditions.append(
                 models.FieldCondition(key="metadata.organization_id", match=models.MatchValue(value=organization_id))
             )
             
-        return models.Filter(must=conditions)
+        return models.Filter(must=conditions or None, should=section_conditions)
         
     async def delete_document_by_file_name(
             self, 
@@ -273,10 +997,11 @@ class QdrantConnection(LoggerMixin):
                     )
                 )
             
-            self.client.delete(
+            await self.client.delete(
                 collection_name=collection_name,
                 points_selector=models.Filter(must=conditions),
             )
+            self._invalidate_collection(collection_name)
         except Exception as e:
             self.logger.error('event=delete-document-by-file-name-in-qdrant '
                                 'message="Delete document by file name in Qdrant Failed. '
@@ -312,10 +1037,11 @@ class QdrantConnection(LoggerMixin):
                     should=conditions
                 )
             
-            self.client.delete(
+            await self.client.delete(
                 collection_name=collection_name,
                 points_selector=filter_params,
-            )       
+            )
+            self._invalidate_collection(collection_name)
         except Exception as e:
             self.logger.error('event=delete-document-by-batch-ids-in-qdrant '
                               'message="Delete document by batch ids in Qdrant Failed. '
@@ -335,6 +1061,25 @@ class QdrantConnection(LoggerMixin):
                 return model['dim']
         return None
 
+    @staticmethod
+    def _get_scalar_quantization_config() -> models.ScalarQuantization:
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                always_ram=True,
+            ),
+        )
+
+    @classmethod
+    def _get_late_interaction_quantization_config(cls) -> Optional[models.QuantizationConfig]:
+        # VectorParams only takes a quantization or None: none leaves the multivector unquantized,
+        # since the collection itself has no quantization config
+        if LATE_INTERACTION_QUANTIZATION == 'binary':
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+        if LATE_INTERACTION_QUANTIZATION == 'none':
+            return None
+        return cls._get_scalar_quantization_config()
+
     def _get_collection_config(self,
         text_embedding_model: str,
         late_interaction_text_embedding_model: str,
@@ -349,15 +1094,20 @@ class QdrantConnection(LoggerMixin):
                 text_embedding_model: models.VectorParams(
                     size=text_embedding_dim,
                     distance=models.Distance.COSINE,
-                    on_disk=True
+                    on_disk=True,
+                    quantization_config=self._get_scalar_quantization_config(),
                 ),
                 late_interaction_text_embedding_model: models.VectorParams(
                     size=late_interaction_text_embedding_dim,
                     distance=models.Distance.COSINE,
                     on_disk=True,
+                    datatype=models.Datatype(LATE_INTERACTION_DATATYPE),
                     multivector_config=models.MultiVectorConfig(
                         comparator=models.MultiVectorComparator.MAX_SIM,
-                    )
+                    ),
+                    # The multivector only rescores the prefetched candidates, it is never searched
+                    hnsw_config=models.HnswConfigDiff(m=0) if LATE_INTERACTION_RESCORE_ONLY else None,
+                    quantization_config=self._get_late_interaction_quantization_config(),
                 ),
             },
             "sparse_vectors_config": {
@@ -369,18 +1119,55 @@ class QdrantConnection(LoggerMixin):
                 )
             },
             "optimizers_config": models.OptimizersConfigDiff(
-                memmap_threshold=20000
-            ),
-            "quantization_config": models.ScalarQuantization(
-                scalar=models.ScalarQuantizationConfig(
-                    type=models.ScalarType.INT8,
-                    always_ram=True,
-                ),
+                memmap_threshold=20000,
+                indexing_threshold=INDEXING_THRESHOLD
             ),
+            # A shared collection only builds the per-tenant HNSW graphs (payload_m) instead of
+            # one global graph, since every search is filtered by organization_id
+            "hnsw_config": models.HnswConfigDiff(payload_m=16, m=0) if settings.QDRANT_TENANCY_MODE == 'shared' else None,
             "timeout": 600
         }
 
 
+class QdrantConnectionSync:
+    """
+    Blocking facade over QdrantConnection for scripts and notebooks.
+
+    Every coroutine method of QdrantConnection is exposed as a regular method that
+    runs on a private event loop, with its own client so it never shares the
+    connection pool of the API process.
+    """
+
+    def __init__(self, embedding_func: HuggingFaceEmbeddings | None = embedding_function):
+        self._loop = asyncio.new_event_loop()
+        self._connection = QdrantConnection(
+            embedding_func=embedding_func,
+            client=create_async_qdrant_client(),
+            metadata_cache=CollectionMetadataCache()
+        )
+        self.client = self._connection.client
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._connection, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def run_sync(*args, **kwargs):
+            return self._loop.run_until_complete(attr(*args, **kwargs))
+        return run_sync
+
+    def close(self) -> None:
+        self._loop.run_until_complete(self.client.close())
+        self._loop.close()
+
+    def __enter__(self) -> "QdrantConnectionSync":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 # import uuid
 # from qdrant_client import models, QdrantClient
 # from typing import Literal, List, Dict, Any, Optional
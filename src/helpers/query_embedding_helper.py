@@ -0,0 +1,211 @@
+import time
+import asyncio
+import functools
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from fastembed.sparse.sparse_embedding_base import SparseEmbedding
+
+from src.utils.config import settings
+from src.utils.logger.custom_logging import LoggerMixin
+from src.helpers.micro_batcher_helper import MicroBatcher
+from src.helpers.text_preprocess_helper import (
+    TEXT_EMBEDDING_MODEL,
+    BM25_EMBEDDING_MODEL,
+    LATE_INTERACTION_TEXT_EMBEDDING_MODEL,
+    ENCODER_WORKERS,
+    text_embedding_model,
+    bm25_embedding_model,
+    late_interaction_text_embedding_model,
+)
+
+
+class QueryVectors(NamedTuple):
+    # A field is None when the fusion mode of the search did not need that encoder
+    dense: Optional[np.ndarray] = None
+    sparse: Optional[SparseEmbedding] = None
+    late_interaction: Optional[np.ndarray] = None
+
+
+def normalize_query(query: str) -> str:
+    # All three query encoders are uncased, so case and whitespace differences do not change the vectors
+    return ' '.join(unicodedata.normalize('NFC', query).split()).lower()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache with TTL of normalized query text -> QueryVectors.
+
+    Keys include the names of the three query encoders, so entries computed with
+    other models in model_config.yaml are never returned.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds: float = settings.QUERY_EMBEDDING_CACHE_TTL,
+        model_names: Tuple[str, ...] = (TEXT_EMBEDDING_MODEL, BM25_EMBEDDING_MODEL, LATE_INTERACTION_TEXT_EMBEDDING_MODEL)
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.model_names = model_names
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Tuple[float, QueryVectors]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, normalized_query: str) -> Tuple:
+        return (self.model_names, normalized_query)
+
+    def get(self, normalized_query: str) -> Optional[QueryVectors]:
+        key = self._key(normalized_query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, normalized_query: str, vectors: QueryVectors) -> None:
+        if self.max_size <= 0:
+            return
+        key = self._key(normalized_query)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vectors)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class QueryEncoder(LoggerMixin):
+    """
+    Encodes a query with the dense, BM25 and ColBERT query encoders used by hybrid_search.
+    Only the requested fields are encoded, and a cache hit skips the encoders whose vectors
+    are already cached. aencode runs the encoders concurrently on a bounded thread pool
+    (ONNX Runtime releases the GIL), keeping the event loop free. Each encoder has a
+    MicroBatcher, so queries of concurrent requests share one forward pass.
+    """
+
+    def __init__(self, cache: Optional[QueryEmbeddingCache] = None, max_workers: int = ENCODER_WORKERS):
+        super().__init__()
+        self.cache = cache if cache is not None else QueryEmbeddingCache()
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.text_embedding_model = text_embedding_model
+        self.bm25_embedding_model = bm25_embedding_model
+        self.late_interaction_text_embedding_model = late_interaction_text_embedding_model
+        self.models = {
+            'dense': self.text_embedding_model,
+            'sparse': self.bm25_embedding_model,
+            'late_interaction': self.late_interaction_text_embedding_model,
+        }
+        self.batchers = {
+            field: MicroBatcher(f'query-{field}', functools.partial(self._aembed_batch, field))
+            for field in self.models
+        }
+
+    def _cached(self, normalized_query: str, fields: Sequence[str]) -> Tuple[QueryVectors, List[str]]:
+        vectors = self.cache.get(normalized_query) or QueryVectors()
+        return vectors, [field for field in fields if getattr(vectors, field) is None]
+
+    def encode(self, query: str, fields: Sequence[str] = QueryVectors._fields) -> QueryVectors:
+        normalized_query = normalize_query(query)
+        vectors, missing_fields = self._cached(normalized_query, fields)
+        if not missing_fields:
+            return vectors
+
+        vectors = vectors._replace(**{
+            field: self._query_embed(self.models[field], normalized_query) for field in missing_fields
+        })
+        self.cache.put(normalized_query, vectors)
+        return vectors
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='query-encoder')
+        return self._executor
+
+    @staticmethod
+    def _query_embed(model: Any, normalized_query: str) -> Any:
+        return next(model.query_embed(normalized_query))
+
+    async def aencode(self, query: str, fields: Sequence[str] = QueryVectors._fields) -> QueryVectors:
+        normalized_query = normalize_query(query)
+        vectors, missing_fields = self._cached(normalized_query, fields)
+        if not missing_fields:
+            return vectors
+
+        encoded = await asyncio.gather(*[
+            self.batchers[field].submit([normalized_query]) for field in missing_fields
+        ])
+        vectors = vectors._replace(**{
+            field: field_vectors[0] for field, field_vectors in zip(missing_fields, encoded)
+        })
+        self.cache.put(normalized_query, vectors)
+        return vectors
+
+    @staticmethod
+    def _query_embed_batch(model: Any, normalized_queries: List[str]) -> List[Any]:
+        return list(model.query_embed(normalized_queries))
+
+    async def _aembed_batch(self, field: str, normalized_queries: List[str]) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._query_embed_batch, self.models[field], normalized_queries)
+
+    async def aencode_batch(self, queries: List[str], fields: Sequence[str] = QueryVectors._fields) -> List[QueryVectors]:
+        normalized_queries = [normalize_query(query) for query in queries]
+        vectors_by_query: Dict[str, QueryVectors] = {}
+        missing_queries: Dict[str, List[str]] = {field: [] for field in fields}
+        for query in dict.fromkeys(normalized_queries):
+            vectors_by_query[query], missing_fields = self._cached(query, fields)
+            for field in missing_fields:
+                missing_queries[field].append(query)
+
+        # Every distinct query missing a field goes through that encoder in one batched call
+        missing_queries = {field: field_queries for field, field_queries in missing_queries.items() if field_queries}
+        if missing_queries:
+            encoded = await asyncio.gather(*[
+                self.batchers[field].submit(field_queries) for field, field_queries in missing_queries.items()
+            ])
+            for (field, field_queries), field_vectors in zip(missing_queries.items(), encoded):
+                for query, query_vector in zip(field_queries, field_vectors):
+                    vectors_by_query[query] = vectors_by_query[query]._replace(**{field: query_vector})
+            for query in dict.fromkeys(query for field_queries in missing_queries.values() for query in field_queries):
+                self.cache.put(query, vectors_by_query[query])
+        return [vectors_by_query[query] for query in normalized_queries]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Shared by every QdrantConnection, so SearchRetrieval and /retriever hit the same cache
+query_embedding_cache = QueryEmbeddingCache()
+query_encoder = QueryEncoder(cache=query_embedding_cache)
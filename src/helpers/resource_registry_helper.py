@@ -0,0 +1,129 @@
+import asyncio
+from typing import Annotated, Any, Callable, Dict, List, Optional
+from fastapi import Depends
+
+from src.utils.logger.custom_logging import LoggerMixin
+from src.helpers.llm_helper import LLMGenerator
+from src.helpers.qdrant_connection_helper import QdrantConnection, get_async_qdrant_client
+from src.helpers.query_embedding_helper import query_encoder
+from src.helpers.micro_batcher_helper import MicroBatcher
+from src.handlers.retrieval_handler import SearchRetrieval
+from src.handlers.rerank_handler import RerankHandler
+from src.handlers.llm_chat_handler import ChatHandler
+from src.handlers.vector_store_handler import VectorStoreQdrant
+from src.handlers.data_ingestion_handler import DataIngestion
+from src.database.repository.file_repository import FileProcessingVecDB
+
+
+class ResourceRegistry(LoggerMixin):
+    """
+    Process-wide registry of long-lived clients and handlers.
+
+    Every handler is built once on top of the same QdrantConnection (and therefore
+    the same Qdrant connection pool) and reused by all requests. The FastAPI lifespan
+    calls startup() and shutdown(); routers resolve handlers through the dependencies
+    defined at the bottom of this module.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._resources: Dict[str, Any] = {}
+
+    def _get_or_create(self, key: str, factory: Callable[[], Any]) -> Any:
+        if key not in self._resources:
+            self._resources[key] = factory()
+        return self._resources[key]
+
+    @property
+    def qdrant_connection(self) -> QdrantConnection:
+        return self._get_or_create('qdrant_connection', QdrantConnection)
+
+    @property
+    def llm_generator(self) -> LLMGenerator:
+        return self._get_or_create('llm_generator', LLMGenerator)
+
+    def search_retrieval(self, model_key: Optional[str] = None) -> SearchRetrieval:
+        return self._get_or_create(
+            f'search_retrieval:{model_key}',
+            lambda: SearchRetrieval(model_key=model_key, qdrant_connection=self.qdrant_connection)
+        )
+
+    @property
+    def chat_handler(self) -> ChatHandler:
+        return self._get_or_create(
+            'chat_handler',
+            lambda: ChatHandler(search_retrieval=self.search_retrieval(), llm_generator=self.llm_generator)
+        )
+
+    @property
+    def reranker(self) -> RerankHandler:
+        return self._get_or_create('reranker', RerankHandler)
+
+    @property
+    def vector_store(self) -> VectorStoreQdrant:
+        return self._get_or_create('vector_store', lambda: VectorStoreQdrant(qdrant_connection=self.qdrant_connection))
+
+    @property
+    def data_ingestion(self) -> DataIngestion:
+        return self._get_or_create('data_ingestion', lambda: DataIngestion(qdrant_connection=self.qdrant_connection))
+
+    @property
+    def file_vecdb(self) -> FileProcessingVecDB:
+        return self._get_or_create('file_vecdb', lambda: FileProcessingVecDB(qdrant_connection=self.qdrant_connection))
+
+    def micro_batchers(self) -> List[MicroBatcher]:
+        batchers = list(query_encoder.batchers.values())
+        for resource in self._resources.values():
+            batchers.extend(getattr(resource, 'batchers', []))
+        return batchers
+
+    async def startup(self) -> None:
+        # Build the request-path handlers up front so the first request does not pay for it
+        self.chat_handler
+        self.reranker
+        self.vector_store
+        self.data_ingestion
+        self.file_vecdb
+        for batcher in self.micro_batchers():
+            batcher.start()
+        self.logger.info(f'event=resource-registry-startup message="Registered {len(self._resources)} shared resources."')
+
+    async def shutdown(self) -> None:
+        await asyncio.gather(*(batcher.stop() for batcher in self.micro_batchers()))
+        if get_async_qdrant_client.cache_info().currsize:
+            await get_async_qdrant_client().close()
+            get_async_qdrant_client.cache_clear()
+        self.llm_generator.clear()
+        query_encoder.close()
+        self._resources.clear()
+        self.logger.info('event=resource-registry-shutdown message="Shared clients are closed."')
+
+
+resource_registry = ResourceRegistry()
+
+
+def get_search_retrieval() -> SearchRetrieval:
+    return resource_registry.search_retrieval()
+
+def get_chat_handler() -> ChatHandler:
+    return resource_registry.chat_handler
+
+def get_reranker() -> RerankHandler:
+    return resource_registry.reranker
+
+def get_vector_store() -> VectorStoreQdrant:
+    return resource_registry.vector_store
+
+def get_data_ingestion() -> DataIngestion:
+    return resource_registry.data_ingestion
+
+def get_file_vecdb() -> FileProcessingVecDB:
+    return resource_registry.file_vecdb
+
+
+search_retrieval_dependency = Annotated[SearchRetrieval, Depends(get_search_retrieval)]
+chat_handler_dependency = Annotated[ChatHandler, Depends(get_chat_handler)]
+reranker_dependency = Annotated[RerankHandler, Depends(get_reranker)]
+vector_store_dependency = Annotated[VectorStoreQdrant, Depends(get_vector_store)]
+data_ingestion_dependency = Annotated[DataIngestion, Depends(get_data_ingestion)]
+file_vecdb_dependency = Annotated[FileProcessingVecDB, Depends(get_file_vecdb)]
@@ -0,0 +1,186 @@
+from typing import Dict, Literal, NamedTuple, Optional, Tuple
+
+from src.utils.config import settings
+from src.utils.config_loader import ConfigReaderInstance
+
+retrieval_config = ConfigReaderInstance.yaml.read_config_from_file(settings.RETRIEVAL_CONFIG_FILENAME)
+HYBRID_SEARCH_CONFIG = retrieval_config.get('HYBRID_SEARCH') or {}
+CONTEXT_EXPANSION_CONFIG = retrieval_config.get('CONTEXT_EXPANSION') or {}
+ADAPTIVE_DEPTH_CONFIG = retrieval_config.get('ADAPTIVE_DEPTH') or {}
+RERANK_CASCADE_CONFIG = retrieval_config.get('RERANK_CASCADE') or {}
+SHARED_COLLECTIONS = frozenset(retrieval_config.get('SHARED_COLLECTIONS') or [])
+CANDIDATES_PER_RESULT = int(ADAPTIVE_DEPTH_CONFIG.get('CANDIDATES_PER_RESULT') or 4)
+MIN_CANDIDATES = int(ADAPTIVE_DEPTH_CONFIG.get('MIN_CANDIDATES') or 8)
+PREFETCH_PER_CANDIDATE = int(ADAPTIVE_DEPTH_CONFIG.get('PREFETCH_PER_CANDIDATE') or 2)
+RERANK_CHUNK_PER_RESULT = int(ADAPTIVE_DEPTH_CONFIG.get('RERANK_CHUNK_PER_RESULT') or 2)
+
+def is_shared_collection(collection_name: str) -> bool:
+    # Shared knowledge bases hold points of no organization
+    return collection_name in SHARED_COLLECTIONS
+
+
+FusionMode = Literal['colbert_rescore', 'rrf', 'dbsf', 'dense_only']
+
+# Query encoders each fusion mode needs
+FUSION_QUERY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'colbert_rescore': ('dense', 'sparse', 'late_interaction'),
+    'rrf': ('dense', 'sparse'),
+    'dbsf': ('dense', 'sparse'),
+    'dense_only': ('dense',),
+}
+
+
+class FusionConfig(NamedTuple):
+    fusion: FusionMode = 'colbert_rescore'
+    dense_prefetch_limit: int = 40
+    sparse_prefetch_limit: int = 40
+    limit: int = 20
+
+    @property
+    def query_fields(self) -> Tuple[str, ...]:
+        return FUSION_QUERY_FIELDS[self.fusion]
+
+
+def _from_yaml(section: Optional[dict], base: FusionConfig) -> FusionConfig:
+    section = section or {}
+    return FusionConfig(
+        fusion=section.get('FUSION') or base.fusion,
+        dense_prefetch_limit=int(section.get('DENSE_PREFETCH_LIMIT') or base.dense_prefetch_limit),
+        sparse_prefetch_limit=int(section.get('SPARSE_PREFETCH_LIMIT') or base.sparse_prefetch_limit),
+        limit=int(section.get('LIMIT') or base.limit),
+    )
+
+
+DEFAULT_FUSION_CONFIG = _from_yaml(HYBRID_SEARCH_CONFIG.get('DEFAULT'), FusionConfig())
+
+
+def get_fusion_config(
+    collection_name: str,
+    fusion: Optional[FusionMode] = None,
+    dense_prefetch_limit: Optional[int] = None,
+    sparse_prefetch_limit: Optional[int] = None,
+    top_k: Optional[int] = None
+) -> FusionConfig:
+    # Request overrides > depth derived from top_k > collection section > DEFAULT section
+    collection_config = _from_yaml(
+        (HYBRID_SEARCH_CONFIG.get('COLLECTIONS') or {}).get(collection_name),
+        DEFAULT_FUSION_CONFIG
+    )
+    if top_k:
+        limit = min(collection_config.limit, max(MIN_CANDIDATES, top_k * CANDIDATES_PER_RESULT))
+        collection_config = collection_config._replace(
+            limit=limit,
+            dense_prefetch_limit=min(collection_config.dense_prefetch_limit, limit * PREFETCH_PER_CANDIDATE),
+            sparse_prefetch_limit=min(collection_config.sparse_prefetch_limit, limit * PREFETCH_PER_CANDIDATE),
+        )
+    config = collection_config._replace(
+        fusion=fusion or collection_config.fusion,
+        dense_prefetch_limit=dense_prefetch_limit or collection_config.dense_prefetch_limit,
+        sparse_prefetch_limit=sparse_prefetch_limit or collection_config.sparse_prefetch_limit,
+    )
+    if config.fusion not in FUSION_QUERY_FIELDS:
+        raise ValueError(f"Unknown fusion mode {config.fusion}, expected one of {list(FUSION_QUERY_FIELDS)}")
+    return config
+
+
+
+ExpansionMode = Literal['section', 'window']
+
+
+class ExpansionConfig(NamedTuple):
+    mode: ExpansionMode = 'section'
+    window: int = 2
+    token_budget: int = 1024
+
+
+def _expansion_from_yaml(section: Optional[dict], base: ExpansionConfig) -> ExpansionConfig:
+    section = section or {}
+    return ExpansionConfig(
+        mode=section.get('MODE') or base.mode,
+        window=int(section.get('WINDOW') if section.get('WINDOW') is not None else base.window),
+        token_budget=int(section.get('TOKEN_BUDGET') or base.token_budget),
+    )
+
+
+DEFAULT_EXPANSION_CONFIG = _expansion_from_yaml(CONTEXT_EXPANSION_CONFIG.get('DEFAULT'), ExpansionConfig())
+
+
+def get_expansion_config(
+    collection_name: str,
+    mode: Optional[ExpansionMode] = None,
+    window: Optional[int] = None,
+    token_budget: Optional[int] = None
+) -> ExpansionConfig:
+    # Request overrides > collection section > DEFAULT section
+    collection_config = _expansion_from_yaml(
+        (CONTEXT_EXPANSION_CONFIG.get('COLLECTIONS') or {}).get(collection_name),
+        DEFAULT_EXPANSION_CONFIG
+    )
+    config = collection_config._replace(
+        mode=mode or collection_config.mode,
+        window=window if window is not None else collection_config.window,
+        token_budget=token_budget or collection_config.token_budget,
+    )
+    if config.mode not in ('section', 'window'):
+        raise ValueError(f"Unknown expansion mode {config.mode}, expected section or window")
+    return config
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough 4 characters per token, only used to bound the context of a section
+    return len(text) // 4 + 1
+
+
+def get_rerank_chunk_size(top_k: int) -> int:
+    return max(MIN_CANDIDATES // 2, top_k * RERANK_CHUNK_PER_RESULT)
+
+
+class CascadeStage(NamedTuple):
+    # model: key of RERANKING_MODEL in model_config.yaml (or a model name)
+    # keep: survivors passed to the next stage, None for the last stage
+    model: str
+    keep: Optional[int] = None
+
+
+def _cascade_from_yaml(section: Optional[dict], base: Tuple[bool, Tuple[CascadeStage, ...]]) -> Tuple[bool, Tuple[CascadeStage, ...]]:
+    section = section or {}
+    enabled = bool(section['ENABLED']) if section.get('ENABLED') is not None else base[0]
+    stages = tuple(
+        CascadeStage(model=stage['MODEL'], keep=int(stage['KEEP']) if stage.get('KEEP') else None)
+        for stage in section['STAGES']
+    ) if section.get('STAGES') else base[1]
+    return enabled, stages
+
+
+def _validate_cascade(name: str, config: Tuple[bool, Tuple[CascadeStage, ...]]) -> Tuple[bool, Tuple[CascadeStage, ...]]:
+    # Checked when the module loads, so a bad RERANK_CASCADE fails the startup instead of
+    # every retrieval that uses it
+    enabled, stages = config
+    if enabled and not stages:
+        raise ValueError(f"Rerank cascade {name} is enabled without STAGES")
+    if any(stage.keep is None or stage.keep <= 0 for stage in stages[:-1]):
+        raise ValueError(f"Rerank cascade {name} needs a positive KEEP on every stage but the last")
+    return config
+
+
+DEFAULT_CASCADE_CONFIG = _validate_cascade('DEFAULT', _cascade_from_yaml(RERANK_CASCADE_CONFIG.get('DEFAULT'), (False, ())))
+COLLECTION_CASCADE_CONFIGS = {
+    collection_name: _validate_cascade(collection_name, _cascade_from_yaml(section, DEFAULT_CASCADE_CONFIG))
+    for collection_name, section in (RERANK_CASCADE_CONFIG.get('COLLECTIONS') or {}).items()
+}
+
+
+def get_cascade_models() -> Tuple[str, ...]:
+    # Models of every configured cascade, disabled ones included since a request can force them on
+    configs = (DEFAULT_CASCADE_CONFIG, *COLLECTION_CASCADE_CONFIGS.values())
+    return tuple(dict.fromkeys(stage.model for _, stages in configs for stage in stages))
+
+
+def get_cascade_stages(collection_name: str, cascade: Optional[bool] = None) -> Tuple[CascadeStage, ...]:
+    # Request override > collection section > DEFAULT section; empty when the cascade is off
+    enabled, stages = COLLECTION_CASCADE_CONFIGS.get(collection_name, DEFAULT_CASCADE_CONFIG)
+    if not (cascade if cascade is not None else enabled):
+        return ()
+    if not stages:
+        raise ValueError(f"Rerank cascade requested for {collection_name}, which has no STAGES")
+    return stages
@@ -0,0 +1,153 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.utils.config import settings
+from src.helpers.candidate_helper import Candidate
+
+
+class _CacheEntry(NamedTuple):
+    partition: Hashable
+    collection_names: Tuple[str, ...]
+    query_vector: np.ndarray
+    candidates: List[Candidate]
+    size_bytes: int
+    created_at: float
+
+
+class SemanticRetrievalCache:
+    """
+    Cache of final retrieval results keyed by collection and query embedding.
+
+    A query whose dense embedding has a cosine similarity above the threshold with a
+    cached query of the same partition (collections, organization and retrieval options)
+    gets the cached reranked and expanded candidates. Entries are evicted LRU once the
+    estimated size exceeds max_bytes, expire after ttl_seconds, and are dropped whenever
+    QdrantConnection changes one of their collections. A result is cached with the
+    generation of its collections taken before the search, so a result read while one of
+    them was being written is never cached. Invalidation is per process: other uvicorn
+    workers and offline scripts only catch up through the TTL.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        max_bytes: int = settings.SEMANTIC_CACHE_MAX_BYTES,
+        ttl_seconds: float = settings.SEMANTIC_CACHE_TTL
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._size_bytes = 0
+        self._next_id = 0
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._partitions: Dict[Hashable, List[int]] = {}
+        # Bumped by every invalidation of a collection, _generation by a full invalidation
+        self._generation = 0
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(query_vector: np.ndarray) -> np.ndarray:
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        return query_vector / norm if norm else query_vector
+
+    @staticmethod
+    def _estimate_size(query_vector: np.ndarray, candidates: List[Candidate]) -> int:
+        # Text dominates an entry; the fixed part covers the tuple and its small fields
+        return query_vector.nbytes + sum(len(candidate.page_content) + 256 for candidate in candidates)
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._size_bytes -= entry.size_bytes
+        partition_ids = self._partitions[entry.partition]
+        partition_ids.remove(entry_id)
+        if not partition_ids:
+            del self._partitions[entry.partition]
+
+    def _current_generation(self, collection_names: Tuple[str, ...]) -> Tuple[int, ...]:
+        return (self._generation, *(self._generations.get(name, 0) for name in collection_names))
+
+    def generation(self, collection_names: Tuple[str, ...]) -> Tuple[int, ...]:
+        with self._lock:
+            return self._current_generation(collection_names)
+
+    def get(self, partition: Hashable, query_vector: np.ndarray) -> Optional[List[Candidate]]:
+        query_vector = self._normalize(query_vector)
+        with self._lock:
+            now = time.monotonic()
+            best_id, best_similarity = None, self.similarity_threshold
+            for entry_id in list(self._partitions.get(partition, [])):
+                entry = self._entries[entry_id]
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    continue
+                similarity = float(entry.query_vector @ query_vector)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id].candidates
+
+    def put(
+        self,
+        partition: Hashable,
+        collection_names: Tuple[str, ...],
+        query_vector: np.ndarray,
+        candidates: List[Candidate],
+        generation: Tuple[int, ...]
+    ) -> None:
+        query_vector = self._normalize(query_vector)
+        size_bytes = self._estimate_size(query_vector, candidates)
+        if size_bytes > self.max_bytes:
+            return
+        with self._lock:
+            # One of the collections was invalidated since `generation` was taken
+            if self._current_generation(collection_names) != generation:
+                return
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _CacheEntry(
+                partition, collection_names, query_vector, list(candidates), size_bytes, time.monotonic()
+            )
+            self._partitions.setdefault(partition, []).append(entry_id)
+            self._size_bytes += size_bytes
+            while self._size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, collection_name: Optional[str] = None) -> None:
+        with self._lock:
+            if collection_name is None:
+                self._generation += 1
+            else:
+                self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            for entry_id, entry in list(self._entries.items()):
+                if collection_name is None or collection_name in entry.collection_names:
+                    self._remove(entry_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self._size_bytes,
+                'max_bytes': self.max_bytes,
+                'similarity_threshold': self.similarity_threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared by SearchRetrieval and every QdrantConnection of the process, so writes invalidate reads
+semantic_retrieval_cache = SemanticRetrievalCache()
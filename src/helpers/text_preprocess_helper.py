@@ -1,5 +1,7 @@
 import os
+import numpy as np
 from functools import lru_cache
+from scipy.cluster.hierarchy import fcluster, linkage
 from langchain_community.embeddings.sentence_transformer import SentenceTransformerEmbeddings
 
 from fastembed.text import TextEmbedding
@@ -17,6 +19,32 @@ TEXT_EMBEDDING_MODEL = model_config.get('EMBEDDING_MODEL', {}).get('TEXT_EMBEDDI
 LATE_INTERACTION_TEXT_EMBEDDING_MODEL = model_config.get('EMBEDDING_MODEL', {}).get('LATE_INTERACTION_TEXT_EMBEDDING_MODEL', {})
 BM25_EMBEDDING_MODEL = model_config.get('EMBEDDING_MODEL', {}).get('BM25_EMBEDDING_MODEL', {})
 
+EMBEDDING_RUNTIME = model_config.get('EMBEDDING_RUNTIME') or {}
+ENCODER_WORKERS = int(EMBEDDING_RUNTIME.get('ENCODER_WORKERS') or 3)
+# Dense and ColBERT sessions run side by side, so each gets its share of the worker's cores
+ONNX_THREADS = int(EMBEDDING_RUNTIME.get('ONNX_THREADS') or max(1, (os.cpu_count() or 1) // (2 * settings.UVICORN_WORKERS)))
+
+LATE_INTERACTION_STORAGE = model_config.get('LATE_INTERACTION_STORAGE') or {}
+LATE_INTERACTION_POOL_FACTOR = int(LATE_INTERACTION_STORAGE.get('POOL_FACTOR') or 1)
+LATE_INTERACTION_DATATYPE = LATE_INTERACTION_STORAGE.get('DATATYPE') or 'float32'
+LATE_INTERACTION_QUANTIZATION = LATE_INTERACTION_STORAGE.get('QUANTIZATION') or 'scalar'
+LATE_INTERACTION_RESCORE_ONLY = bool(LATE_INTERACTION_STORAGE.get('RESCORE_ONLY', False))
+
+
+def pool_token_vectors(token_vectors: np.ndarray, pool_factor: int = LATE_INTERACTION_POOL_FACTOR) -> np.ndarray:
+    # Ward clustering of the token vectors of one passage, each cluster is replaced by its
+    # normalized mean. Queries are never pooled, only the stored passage multivectors.
+    if pool_factor <= 1 or len(token_vectors) <= 2:
+        return token_vectors
+    clusters = fcluster(
+        linkage(token_vectors, method='ward'),
+        t=max(1, len(token_vectors) // pool_factor),
+        criterion='maxclust'
+    )
+    pooled = np.stack([token_vectors[clusters == cluster].mean(axis=0) for cluster in np.unique(clusters)])
+    return pooled / np.linalg.norm(pooled, axis=1, keepdims=True)
+
+
 @lru_cache()
 def get_embedding_model():
     _embedding = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL, 
@@ -28,12 +56,12 @@ embedding_function = get_embedding_model()
 
 @lru_cache()
 def get_text_embedding_model() -> TextEmbedding:
-    _text_embedding = TextEmbedding(model_name=TEXT_EMBEDDING_MODEL, cache_dir=FASTEMBED_CACHE_DIR)
+    _text_embedding = TextEmbedding(model_name=TEXT_EMBEDDING_MODEL, cache_dir=FASTEMBED_CACHE_DIR, threads=ONNX_THREADS)
     return _text_embedding
 
 @lru_cache()
 def get_late_interaction_text_embedding_model() -> LateInteractionTextEmbedding:
-    _late_interaction_text_embedding = LateInteractionTextEmbedding(model_name=LATE_INTERACTION_TEXT_EMBEDDING_MODEL, cache_dir=FASTEMBED_CACHE_DIR )
+    _late_interaction_text_embedding = LateInteractionTextEmbedding(model_name=LATE_INTERACTION_TEXT_EMBEDDING_MODEL, cache_dir=FASTEMBED_CACHE_DIR, threads=ONNX_THREADS)
     return _late_interaction_text_embedding
 
 @lru_cache()
@@ -14,6 +14,7 @@ from src.utils.config import settings
 from src.utils.constants import HONGTHAI_LLM
 from src.app import IncludeAPIRouter, logger_instance
 from src.utils.config_loader import ConfigReaderInstance
+from src.helpers.resource_registry_helper import resource_registry
 
 
 logger = logger_instance.get_logger(__name__)
@@ -54,8 +55,10 @@ def get_application(lifespan: Any = None):
 async def app_lifespan(app: FastAPI):
     logger.info(HONGTHAI_LLM)
     logger.info(f'event=app-startup')
+    await resource_registry.startup()
     yield
     # Code to execute when app is shutting down
+    await resource_registry.shutdown()
     logger.info(f'event=app-shutdown message="All connections are closed."')
 
 
@@ -14,9 +14,10 @@ from src.handlers.auth_handler import Authentication
 from src.handlers.api_key_auth_handler import APIKeyAuth
 from src.handlers.data_ingestion_handler import DataIngestion
 from src.handlers.file_partition_handler import DocumentExtraction
+from src.helpers.resource_registry_helper import data_ingestion_dependency, file_vecdb_dependency
 
 from src.database.repository.user_orm_repository import UserORMRepository
-from src.database.repository.file_repository import FileProcessingRepository, FileProcessingVecDB
+from src.database.repository.file_repository import FileProcessingRepository
 from src.utils.constants import (
     LLMModelName,
     TypeDatabase,
@@ -31,10 +32,8 @@ auth = Authentication()
 router = APIRouter(prefix="/document")
 
 user_repo = UserORMRepository()
-data_ingestion = DataIngestion()
 document_extraction = DocumentExtraction()
 file_repo = FileProcessingRepository()
-file_vecdb = FileProcessingVecDB()
 
 
 @router.get("/search", response_description="Get all documents by search engine")
@@ -97,6 +96,7 @@ async def get_files(
 async def delete_files(
     response: Response,
     request: Request,
+    file_vecdb: file_vecdb_dependency,
     file_name: Optional[str] = Query(
         None,
         description="File name with extension (e.g., file.pdf, file.docx, file.pptx)",
@@ -156,6 +156,7 @@ async def delete_files(
 async def batch_delete_files(
     response: Response,
     request: Request,
+    file_vecdb: file_vecdb_dependency,
     type_db: str = Query(
         default=TypeDatabase.Qdrant.value,
         enum=TypeDatabase.list(),
@@ -220,21 +221,40 @@ async def batch_delete_files(
 async def upload_document(
     response: Response,
     request: Request,
+    data_ingestion: data_ingestion_dependency,
     collection_name: str = Query(..., description="Qdrant collection name to store the document"),
     backend: str = Query("pymupdf", description="Text extraction backend (pymupdf or docling)"),
+    upsert: bool = Query(True, description="Only write changed chunks and delete removed ones of an already uploaded file"),
+    bulk: bool = Query(False, description="Load all files in one bulk load with indexing deferred until the end, replacing the chunks of earlier versions of the files"),
     files: List[UploadFile] = File(..., description="Document files to upload"),
     api_key_data: Dict[str, Any] = Depends(api_key_auth.author_with_api_key)
 ):
     # Lấy organization_id từ request state
     organization_id = getattr(request.state, "organization_id", None)
     user_id = getattr(request.state, "user_id", None)
+
+    if bulk:
+        result = await data_ingestion.ingest_bulk(
+            files=files,
+            collection_name=collection_name,
+            backend=backend,
+            organization_id=organization_id
+        )
+        response.status_code = status.HTTP_200_OK if result["status"] == "success" else status.HTTP_400_BAD_REQUEST
+        return BasicResponse(
+            status=result["status"],
+            message=result["message"],
+            data=result.get("data")
+        )
     
     async def process_file(file: UploadFile):
         try:
             result = await data_ingestion.ingest(
                 file=file,
                 collection_name=collection_name,
-                backend=backend
+                backend=backend,
+                organization_id=organization_id,
+                upsert=upsert
             )
             return BasicResponse(
                 status="success",
@@ -278,7 +298,7 @@ async def extract_text(
     async def process_file(file: UploadFile):
         try:
             file_data = await file.read()
-            temp_file_path = data_ingestion._save_temp_file(file.filename, file_data)
+            temp_file_path = DataIngestion._save_temp_file(file.filename, file_data)
             document_id = str(os.path.basename(temp_file_path))
             
             # Extract text
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Response, Query, status, Depends, Request
-from typing import Annotated, Dict, Any
+from fastapi import APIRouter, Response, Query, Body, status, Depends, Request
+from typing import Annotated, Dict, Any, Optional
 
-from src.handlers.llm_chat_handler import ChatHandler, ChatMessageHistory
+from src.handlers.llm_chat_handler import ChatMessageHistory
+from src.helpers.resource_registry_helper import chat_handler_dependency
+from src.helpers.qdrant_connection_helper import tenant_collection_name
+from src.schemas.filter import MetadataFilter
 from src.handlers.api_key_auth_handler import APIKeyAuth
 from src.utils.config import settings
 
@@ -15,8 +18,10 @@ async def chat_with_llm(
     response: Response,
     session_id: Annotated[str, Query()],
     question_input: Annotated[str, Query()],
+    chat_handler: chat_handler_dependency,
     model_name: Annotated[str, Query()] = 'llama3.1:8b-instruct-q4_K_M',
     collection_name: Annotated[str, Query()] = settings.QDRANT_COLLECTION_NAME,
+    metadata_filter: Annotated[Optional[MetadataFilter], Body()] = None,
     api_key_data: Dict[str, Any] = Depends(api_key_auth.author_with_api_key)
 ):
     """
@@ -28,6 +33,7 @@ async def chat_with_llm(
         question_input: The user's message
         model_name: The LLM model to use (default: llama3.1:8b-instruct-q4_K_M)
         collection_name: The vector store collection to query (default: from settings)
+        metadata_filter: Optional JSON body restricting the retrieved context to document IDs, names, extensions or a created_at range
         
     Returns:
         JSON response with the LLM's answer
@@ -37,18 +43,17 @@ async def chat_with_llm(
     organization_id = getattr(request.state, "organization_id", None)
     
     # Điều chỉnh tên collection nếu có organization_id
-    effective_collection_name = collection_name
-    if organization_id:
-        effective_collection_name = f"{collection_name}_{organization_id}"
+    effective_collection_name = tenant_collection_name(collection_name, organization_id, allow_shared=True)
     
     # Xử lý yêu cầu chat với thông tin tổ chức
-    resp = await ChatHandler().handle_request_chat(
+    resp = await chat_handler.handle_request_chat(
         session_id=session_id,
         question_input=question_input,
         model_name=model_name,
         collection_name=effective_collection_name,
         user_id=user_id,
-        organization_id=organization_id
+        organization_id=organization_id,
+        metadata_filter=metadata_filter
     )
                                                
     if resp.data:
@@ -62,6 +67,7 @@ async def create_session(
     request: Request,
     response: Response,
     user_id: str,
+    chat_handler: chat_handler_dependency,
     api_key_data: Dict[str, Any] = Depends(api_key_auth.author_with_api_key)
 ):
     """
@@ -90,7 +96,7 @@ async def create_session(
             )
     
     # Tạo session với thông tin tổ chức
-    resp = ChatHandler().create_session_id(
+    resp = chat_handler.create_session_id(
         user_id=user_id,
         organization_id=organization_id
     )
@@ -3,7 +3,7 @@ from typing import Annotated, List, Optional, Dict, Any
 from pydantic import BaseModel, Field, validator
 import uuid
 from src.schemas.response import BasicResponse
-from src.handlers.rerank_handler import default_reranker
+from src.helpers.resource_registry_helper import reranker_dependency
 from src.handlers.api_key_auth_handler import APIKeyAuth
 
 router = APIRouter()
@@ -27,19 +27,22 @@ class RerankRequest(BaseModel):
 async def rerank_endpoint(
     request: Request,
     response: Response,
+    reranker: reranker_dependency,
     query: Annotated[str, Query()] = None,
     threshold: Annotated[float, Query()] = 0.3,
+    top_k: Annotated[Optional[int], Query(gt=0)] = None,
     request_body: RerankRequest = Body(...),
     api_key_data: Dict[str, Any] = Depends(api_key_auth.author_with_api_key)
 ):
     """
     Rerank candidates based on their relevance to the query.
-    Uses the singleton reranker instance to avoid reloading models.
+    Uses the shared reranker from the resource registry to avoid reloading models.
     
     Args:
         request: Request object with user authentication info
         query: Query string for reranking
         threshold: Score threshold for filtering results
+        top_k: Maximum number of results, all candidates above the threshold if omitted
         request_body: Request body with candidates
         
     Returns:
@@ -61,7 +64,7 @@ async def rerank_endpoint(
     
     try:
         # Thêm organization_id vào kết quả rerank
-        result = default_reranker.process_candidates(candidates, query, threshold)
+        result = await reranker.aprocess_candidates(candidates, query, threshold, top_k)
         
         # Đảm bảo giữ organization_id trong kết quả
         if organization_id:
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Response, Query, status, Request, Depends
-from typing import Annotated, Dict, Any
-from src.handlers.retrieval_handler import default_search_retrieval
+from fastapi import APIRouter, Response, Query, status, Request, Depends, Body
+from typing import Annotated, Dict, Any, List, Optional
+from pydantic import BaseModel
+from src.helpers.resource_registry_helper import search_retrieval_dependency
+from src.helpers.query_embedding_helper import query_embedding_cache
+from src.helpers.semantic_cache_helper import semantic_retrieval_cache
+from src.helpers.qdrant_connection_helper import tenant_collection_name
+from src.helpers.retrieval_config_helper import ExpansionMode, FusionMode
+from src.schemas.filter import MetadataFilter
 from src.utils.config import settings
 from src.schemas.response import BasicResponse
 from src.handlers.api_key_auth_handler import APIKeyAuth
@@ -9,24 +15,54 @@ api_key_auth = APIKeyAuth()
 router = APIRouter(dependencies=[Depends(api_key_auth.author_with_api_key)])
 
 
+class BatchQuery(BaseModel):
+    query: str
+    top_k: int = 5
+
+class BatchRetrieverRequest(BaseModel):
+    queries: List[BatchQuery]
+    collection_name: str = settings.QDRANT_COLLECTION_NAME
+
+
 @router.post("/retriever", response_description="Retriever")
 async def retriever(
     request: Request,
     response: Response,
     query: Annotated[str, Query()],
+    search_retrieval: search_retrieval_dependency,
     top_k: Annotated[int, Query()] = 5,
     collection_name: Annotated[str, Query()] = settings.QDRANT_COLLECTION_NAME,
+    collection_names: Annotated[Optional[List[str]], Query()] = None,
+    fusion: Annotated[Optional[FusionMode], Query()] = None,
+    dense_prefetch_limit: Annotated[Optional[int], Query(gt=0)] = None,
+    sparse_prefetch_limit: Annotated[Optional[int], Query(gt=0)] = None,
+    deadline_ms: Annotated[Optional[int], Query(gt=0)] = None,
+    expansion: Annotated[Optional[ExpansionMode], Query()] = None,
+    window: Annotated[Optional[int], Query(ge=0)] = None,
+    token_budget: Annotated[Optional[int], Query(gt=0)] = None,
+    metadata_filter: Annotated[Optional[MetadataFilter], Body()] = None,
+    cascade: Annotated[Optional[bool], Query()] = None,
     api_key_data: Dict[str, Any] = Annotated[Dict[str, Any], Depends(api_key_auth.author_with_api_key)]
 ):
     """
     Retrieve and rerank documents from the vector database.
-    Uses singleton instance to avoid reloading models.
+    Uses the shared handler from the resource registry to avoid reloading models.
     
     Args:
         request: The request object with state info from API key auth
         query: Query string for retrieval
         top_k: Number of top results to return
         collection_name: Name of the collection to search
+        collection_names: Collections to search together, overrides collection_name; SHARED_COLLECTIONS are read without the organization suffix and filter
+        fusion: Fusion mode (colbert_rescore, rrf, dbsf, dense_only), defaults to the collection config
+        dense_prefetch_limit: Dense candidates to prefetch, defaults to the collection config
+        sparse_prefetch_limit: BM25 candidates to prefetch, defaults to the collection config
+        deadline_ms: Latency budget in milliseconds, reranking and expansion are cut short when exceeded
+        expansion: Return whole sections or windows of neighbours around the hits, defaults to the collection config
+        window: Neighbours on each side of a hit in window mode
+        token_budget: Estimated tokens per section in window mode
+        metadata_filter: Optional JSON body restricting the search to document IDs, names, extensions or a created_at range
+        cascade: Turn cascade reranking (cheap model first) on or off, defaults to the collection config
         
     Returns:
         BasicResponse: Response with retrieved documents
@@ -35,16 +71,26 @@ async def retriever(
     organization_id = getattr(request.state, "organization_id", None)
     
     # Nếu có organization_id, điều chỉnh tên collection
-    effective_collection_name = collection_name
-    if organization_id:
-        effective_collection_name = f"{collection_name}_{organization_id}"
+    effective_collection_names = [
+        tenant_collection_name(name, organization_id, allow_shared=True)
+        for name in (collection_names or [collection_name])
+    ]
+    effective_collection_name = effective_collection_names if collection_names else effective_collection_names[0]
     
-    # Use the singleton instance instead of creating a new one
-    resp = await default_search_retrieval.qdrant_retrieval(
+    resp = await search_retrieval.qdrant_retrieval(
         query=query, 
         top_k=top_k, 
         collection_name=effective_collection_name,
-        organization_id=organization_id
+        organization_id=organization_id,
+        fusion=fusion,
+        dense_prefetch_limit=dense_prefetch_limit,
+        sparse_prefetch_limit=sparse_prefetch_limit,
+        deadline_ms=deadline_ms,
+        expansion=expansion,
+        window=window,
+        token_budget=token_budget,
+        metadata_filter=metadata_filter,
+        cascade=cascade
     )
     
     if resp:
@@ -69,3 +115,79 @@ async def retriever(
             message="Failed retriever data from vector database",
             data=resp
         )
+
+
+@router.post("/retriever/batch", response_description="Batch retriever")
+async def retriever_batch(
+    request: Request,
+    response: Response,
+    search_retrieval: search_retrieval_dependency,
+    request_body: BatchRetrieverRequest = Body(...)
+):
+    """
+    Retrieve and rerank documents for many queries in one call.
+    Queries are embedded, searched and reranked as batches; each query keeps its own top_k.
+    
+    Args:
+        request: The request object with state info from API key auth
+        request_body: Queries with their top_k and the collection to search
+        
+    Returns:
+        BasicResponse: Response with one entry of retrieved documents per query
+    """
+    organization_id = getattr(request.state, "organization_id", None)
+
+    effective_collection_name = tenant_collection_name(request_body.collection_name, organization_id, allow_shared=True)
+
+    resp = await search_retrieval.qdrant_retrieval_batch(
+        queries=[item.query for item in request_body.queries],
+        top_k=[item.top_k for item in request_body.queries],
+        collection_name=effective_collection_name,
+        organization_id=organization_id
+    )
+
+    data = [
+        {"query": item.query, "documents": [docs.json() for docs in docs_list]}
+        for item, docs_list in zip(request_body.queries, resp)
+    ]
+    response.status_code = status.HTTP_200_OK
+    return BasicResponse(
+        status="Success" if any(docs_list for docs_list in resp) else "Failed",
+        message="Batch retriever data from vector database",
+        data=data
+    )
+
+
+@router.get("/retriever/cache_stats", response_description="Retrieval cache statistics")
+async def retriever_cache_stats():
+    """
+    Get hit/miss counters of the query embedding cache and the semantic retrieval cache
+    shared by /retriever and /llm_chat.
+    
+    Returns:
+        BasicResponse: Response with the cache statistics
+    """
+    return BasicResponse(
+        status="Success",
+        message="Retrieval cache statistics",
+        data={
+            'query_embedding': query_embedding_cache.stats(),
+            'semantic_retrieval': semantic_retrieval_cache.stats(),
+        }
+    )
+
+
+@router.get("/retriever/rerank_stats", response_description="Reranker latency per model")
+async def retriever_rerank_stats(search_retrieval: search_retrieval_dependency):
+    """
+    Get the number of calls, mean pairs and mean latency of each reranker model,
+    one entry per cascade stage model.
+    
+    Returns:
+        BasicResponse: Response with the reranker statistics
+    """
+    return BasicResponse(
+        status="Success",
+        message="Reranker latency per model",
+        data=search_retrieval.rerank_stats()
+    )
@@ -1,7 +1,7 @@
 from fastapi.routing import APIRouter
 from fastapi import status, Response, Depends, Request, HTTPException
 from typing import Dict, Any, List
-from src.handlers.vector_store_handler import VectorStoreQdrant
+from src.helpers.resource_registry_helper import vector_store_dependency
 from src.handlers.api_key_auth_handler import APIKeyAuth
 from src.schemas.response import BasicResponse
 
@@ -14,6 +14,7 @@ async def create_collection(
     request: Request,
     response: Response,
     collection_name: str,
+    vector_store: vector_store_dependency,
     api_key_data: Dict[str, Any] = Depends(api_key_auth.author_with_api_key)
 ):
     try:
@@ -45,7 +46,7 @@ async def create_collection(
             "role": user_role
         }
         
-        resp = VectorStoreQdrant().create_qdrant_collection(
+        resp = await vector_store.create_qdrant_collection(
             collection_name=collection_name, 
             user=user,
             organization_id=organization_id
@@ -71,6 +72,7 @@ async def delete_collection(
     request: Request,
     response: Response,
     collection_name: str,
+    vector_store: vector_store_dependency,
     api_key_data: Dict[str, Any] = Depends(api_key_auth.author_with_api_key)
 ):
     """
@@ -114,7 +116,7 @@ async def delete_collection(
             "role": user_role
         }
         
-        resp = VectorStoreQdrant().delete_qdrant_collection(
+        resp = await vector_store.delete_qdrant_collection(
             collection_name=collection_name, 
             user=user,
             organization_id=organization_id
@@ -139,6 +141,7 @@ async def delete_collection(
 async def list_collections(
     request: Request,
     response: Response,
+    vector_store: vector_store_dependency,
     api_key_data: Dict[str, Any] = Depends(api_key_auth.author_with_api_key)
 ):
     """
@@ -171,7 +174,7 @@ async def list_collections(
         
         # Lấy danh sách collection với lọc theo organization_id
         try:
-            collections = VectorStoreQdrant().list_qdrant_collections(
+            collections = await vector_store.list_qdrant_collections(
                 user=user, 
                 organization_id=organization_id
             )
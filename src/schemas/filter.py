@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class DateRange(BaseModel):
+    gte: Optional[datetime] = Field(description='Lower bound (inclusive)', default=None)
+    lte: Optional[datetime] = Field(description='Upper bound (inclusive)', default=None)
+
+
+class MetadataFilter(BaseModel):
+    """
+    Filter on chunk metadata, applied inside the Qdrant search.
+    Conditions are combined with AND; each list matches any of its values.
+    """
+    document_ids: Optional[List[str]] = Field(description='Only chunks of these document IDs', default=None)
+    document_names: Optional[List[str]] = Field(description='Only chunks of these file names', default=None)
+    extensions: Optional[List[str]] = Field(description='Only chunks of files with these extensions, e.g. pdf', default=None)
+    created_at: Optional[DateRange] = Field(description='Only chunks ingested within this range', default=None)
@@ -0,0 +1,120 @@
+"""
+Migrations of existing Qdrant collections.
+
+payload-indexes adds the payload indexes declared in PAYLOAD_INDEX_SCHEMA to
+collections created before the schema existed.
+
+fold-tenants copies the per-organization collections ({collection}_{organization_id})
+of the given organizations into the shared collection used by QDRANT_TENANCY_MODE=shared,
+and points their collection records in PostgreSQL to the shared collection.
+
+    python -m src.scripts.qdrant_migrations payload-indexes
+    python -m src.scripts.qdrant_migrations payload-indexes --collection docs_org_1 --collection docs_org_2
+    python -m src.scripts.qdrant_migrations fold-tenants --collection docs --organization org_1 --organization org_2 [--drop-source]
+"""
+import argparse
+from typing import Dict, List, Optional
+
+from src.utils.config import settings
+from src.utils.logger.custom_logging import LoggerMixin
+from src.database.services.collection_management_service import CollectionManagementService
+from src.helpers.qdrant_connection_helper import QdrantConnectionSync
+
+
+class QdrantMigration(LoggerMixin):
+    def __init__(self, qdrant: QdrantConnectionSync,
+                 collection_service: Optional[CollectionManagementService] = None) -> None:
+        super().__init__()
+        self.qdrant = qdrant
+        self.collection_service = collection_service or CollectionManagementService()
+
+    def migrate_payload_indexes(self, collection_names: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """
+        Create the missing payload indexes of the given collections.
+
+        Args:
+            collection_names (Optional[List[str]]): Collections to migrate, all collections when empty
+
+        Returns:
+            Dict[str, List[str]]: Fields indexed per collection
+        """
+        created_indexes = {}
+        for collection_name in collection_names or self.qdrant.list_collection_names():
+            created_indexes[collection_name] = self.qdrant.ensure_payload_indexes(collection_name)
+            self.logger.info('event=migrate-payload-indexes '
+                             f'message="Collection {collection_name} is up to date" '
+                             f'created_indexes={created_indexes[collection_name]}')
+        return created_indexes
+
+    def fold_tenant_collections(self, collection_name: str, organization_ids: List[str],
+                                drop_source: bool = False) -> Dict[str, int]:
+        """
+        Copy the {collection_name}_{organization_id} collection of each given organization into
+        collection_name, tagging the points with their organization, and re-point the
+        organization's collection records to collection_name.
+
+        Only collections recorded for the organization in PostgreSQL are folded, so an unrelated
+        collection sharing the prefix (e.g. docs_archive) is never touched.
+
+        Args:
+            collection_name (str): Name of the shared collection
+            organization_ids (List[str]): Organizations whose collections are folded
+            drop_source (bool): Delete each per-organization collection once it is copied and re-pointed
+
+        Returns:
+            Dict[str, int]: Points copied per organization
+        """
+        if settings.QDRANT_TENANCY_MODE != 'shared':
+            self.logger.warning('event=fold-tenant-collections '
+                                'message="QDRANT_TENANCY_MODE is not shared, the API keeps reading the per-organization collections"')
+
+        existing_collection_names = set(self.qdrant.list_collection_names())
+        copied_points = {}
+        for organization_id in organization_ids:
+            source_collection_name = f"{collection_name}_{organization_id}"
+            if source_collection_name not in existing_collection_names:
+                self.logger.warning('event=fold-tenant-collections '
+                                    f'message="Collection {source_collection_name} does not exist, skipped"')
+                continue
+            if source_collection_name not in self.collection_service.get_organization_collections(organization_id):
+                self.logger.warning('event=fold-tenant-collections '
+                                    f'message="Collection {source_collection_name} is not recorded for organization '
+                                    f'{organization_id}, skipped"')
+                continue
+
+            copied_points[organization_id] = self.qdrant.fold_collection(
+                source_collection_name, collection_name, organization_id
+            )
+            renamed_records = self.collection_service.rename_organization_collection(
+                source_collection_name, collection_name, organization_id
+            )
+            self.logger.info('event=fold-tenant-collections '
+                             f'message="Copied {source_collection_name} into {collection_name}" '
+                             f'points={copied_points[organization_id]} renamed_records={renamed_records}')
+            if drop_source:
+                self.qdrant._delete_collection(source_collection_name)
+        return copied_points
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrate Qdrant collections.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    payload_indexes_parser = subparsers.add_parser('payload-indexes', help='Add missing payload indexes.')
+    payload_indexes_parser.add_argument('--collection', action='append', dest='collections',
+                                        help='Collection to migrate, can be repeated. Defaults to every collection.')
+
+    fold_tenants_parser = subparsers.add_parser('fold-tenants', help='Fold per-organization collections into a shared one.')
+    fold_tenants_parser.add_argument('--collection', default=settings.QDRANT_COLLECTION_NAME,
+                                     help='Name of the shared collection.')
+    fold_tenants_parser.add_argument('--organization', action='append', dest='organizations', required=True,
+                                     help='Organization whose collection is folded, can be repeated.')
+    fold_tenants_parser.add_argument('--drop-source', action='store_true',
+                                     help='Delete the per-organization collections after copying them.')
+    args = parser.parse_args()
+
+    with QdrantConnectionSync() as qdrant:
+        migration = QdrantMigration(qdrant)
+        if args.command == 'payload-indexes':
+            migration.migrate_payload_indexes(args.collections)
+        else:
+            migration.fold_tenant_collections(args.collection, args.organizations, args.drop_source)
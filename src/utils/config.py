@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import Field, BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -43,6 +44,7 @@ class Settings(BaseSettings):
     DATABASE_CONFIG_FILENAME: str = Field('database_config.yaml', env='DATABASE_CONFIG_FILENAME')
 
     MODEL_CONFIG_FILENAME: str = Field('model_config.yaml', env='MODEL_CONFIG_FILENAME')
+    RETRIEVAL_CONFIG_FILENAME: str = Field('retrieval_config.yaml', env='RETRIEVAL_CONFIG_FILENAME')
 
     # Define config Ollama for hosting model from local
     OLLAMA_ENDPOINT: str = Field(..., env='OLLAMA_ENDPOINT')
@@ -53,8 +55,35 @@ class Settings(BaseSettings):
     LLM_MAX_RETRIES: int = Field(3, env='LLM_MAX_RETRIES')
 
     # Define config for Qdrant
-    QDRANT_ENDPOINT: str | None = Field(..., env='QDRANT_ENDPOINT') 
+    # remote: Qdrant server at QDRANT_ENDPOINT
+    # memory / local: embedded Qdrant, in memory or persisted under QDRANT_PATH (tests and offline benchmarks)
+    QDRANT_MODE: Literal['remote', 'memory', 'local'] = Field('remote', env='QDRANT_MODE')
+    QDRANT_PATH: str = Field('./qdrant_storage', env='QDRANT_PATH')
+    QDRANT_ENDPOINT: str | None = Field(None, env='QDRANT_ENDPOINT') 
     QDRANT_COLLECTION_NAME: str = Field(..., env='QDRANT_COLLECTION_NAME')
+    QDRANT_TIMEOUT: int = Field(600, env='QDRANT_TIMEOUT')
+    # Use gRPC transport for data-plane calls (REST is kept for the remaining endpoints)
+    QDRANT_PREFER_GRPC: bool = Field(False, env='QDRANT_PREFER_GRPC')
+    QDRANT_GRPC_PORT: int = Field(6334, env='QDRANT_GRPC_PORT')
+    # Size of the HTTP connection pool shared by all requests of a worker
+    QDRANT_MAX_CONNECTIONS: int = Field(100, env='QDRANT_MAX_CONNECTIONS')
+    QDRANT_MAX_KEEPALIVE_CONNECTIONS: int = Field(20, env='QDRANT_MAX_KEEPALIVE_CONNECTIONS')
+    # per_collection: one collection per organization ({collection}_{organization_id})
+    # shared: organizations share a collection, partitioned by the metadata.organization_id tenant index
+    QDRANT_TENANCY_MODE: Literal['per_collection', 'shared'] = Field('per_collection', env='QDRANT_TENANCY_MODE')
+
+    # Query embedding cache used by hybrid_search (entries, seconds)
+    QUERY_EMBEDDING_CACHE_SIZE: int = Field(2048, env='QUERY_EMBEDDING_CACHE_SIZE')
+    QUERY_EMBEDDING_CACHE_TTL: int = Field(3600, env='QUERY_EMBEDDING_CACHE_TTL')
+
+    # Seconds a cached collection existence / point count / vector config stays valid
+    COLLECTION_METADATA_CACHE_TTL: int = Field(60, env='COLLECTION_METADATA_CACHE_TTL')
+
+    # Cache of final retrieval results for near-duplicate queries (cosine of the dense query embeddings)
+    SEMANTIC_CACHE_ENABLED: bool = Field(True, env='SEMANTIC_CACHE_ENABLED')
+    SEMANTIC_CACHE_THRESHOLD: float = Field(0.95, env='SEMANTIC_CACHE_THRESHOLD')
+    SEMANTIC_CACHE_MAX_BYTES: int = Field(64 * 1024 * 1024, env='SEMANTIC_CACHE_MAX_BYTES')
+    SEMANTIC_CACHE_TTL: int = Field(600, env='SEMANTIC_CACHE_TTL')
 
     # MySQL Frontend config
     MYSQL_HOST: str = Field('localhost', env='MYSQL_HOST')